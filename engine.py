@@ -12,15 +12,21 @@
 
 import os
 import sys
+import json
 import time
 import inspect
 import logging
+import threading
+import importlib
 import traceback
+import collections
 
 import tank
 from tank.log import LogManager
 from tank.platform import Engine
 from tank.platform.constants import SHOTGUN_ENGINE_NAME
+from tank.util import LocalFileStorageManager
+from tank.util.filesystem import ensure_folder_exists
 
 import c4d
 from c4d import gui
@@ -72,6 +78,113 @@ def display_debug(msg):
         print("%s - Shotgun Debug | Cinema engine | %s " % (t, msg))
 
 
+def _timing(name, start):
+    """
+    Returns a (name, start, wall, cpu) tuple for a phase started at the given
+    (wall, cpu) times.
+    """
+    return (name, start[0], time.time() - start[0], time.process_time() - start[1])
+
+
+class CinemaLogSink(object):
+    """
+    Buffers the toolkit log messages and prints them to the Cinema console in
+    batches from the main thread.
+
+    Messages are kept in a ring buffer which is flushed once a timer expires,
+    through a single main thread call. When the buffer overflows the oldest
+    messages are dropped and counted.
+    """
+
+    DEBUG_FORMATTER = logging.Formatter(
+        "Debug: Shotgun %(basename)s: %(message)s"
+    )
+    FORMATTER = logging.Formatter("Shotgun %(basename)s: %(message)s")
+
+    def __init__(self, engine, max_records=2000, interval=0.25):
+        """
+        :param engine: The engine used to run the flushes in the main thread.
+        :param int max_records: Number of messages kept in the buffer.
+        :param float interval: Number of seconds messages are buffered for.
+        """
+        self._engine = engine
+        self._interval = interval
+        self._records = collections.deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._flush_pending = False
+        self._dropped_reported = 0
+
+        self.dropped = 0
+
+    def emit(self, record):
+        """
+        Formats and buffers a logging record.
+
+        :param record: Standard python logging record.
+        """
+        if record.levelno >= logging.ERROR:
+            label = "Error"
+        elif record.levelno >= logging.WARNING:
+            label = "Warning"
+        elif record.levelno >= logging.INFO:
+            label = "Info"
+        elif os.environ.get("TK_DEBUG") == "1":
+            label = "Debug"
+        else:
+            # debug messages are only displayed in debug mode
+            return
+
+        if record.levelno < logging.INFO:
+            msg = self.DEBUG_FORMATTER.format(record)
+        else:
+            msg = self.FORMATTER.format(record)
+
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self.dropped += 1
+            self._records.append((record.created, label, msg))
+
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+
+        timer = threading.Timer(self._interval, self._schedule_flush)
+        timer.daemon = True
+        timer.start()
+
+    def _schedule_flush(self):
+        self._engine.async_execute_in_main_thread(self.flush)
+
+    def flush(self):
+        """
+        Prints the buffered messages to the Cinema console. Must be called
+        from the main thread.
+        """
+        with self._lock:
+            records = list(self._records)
+            self._records.clear()
+            self._flush_pending = False
+            dropped = self.dropped - self._dropped_reported
+            self._dropped_reported = self.dropped
+
+        if not records and not dropped:
+            return
+
+        # messages keep the time they were logged at
+        lines = [
+            "%s - Shotgun %s | Cinema engine | %s "
+            % (time.asctime(time.localtime(created)), label, msg)
+            for (created, label, msg) in records
+        ]
+        if dropped:
+            t = time.asctime(time.localtime())
+            lines.append(
+                "%s - Shotgun Warning | Cinema engine | %d log messages were "
+                "dropped " % (t, dropped)
+            )
+        print("\n".join(lines))
+
+
 ###############################################################################
 # methods to support the state when the engine cannot start up
 # for example if a non-tank file is loaded in cinema
@@ -96,7 +209,7 @@ def refresh_engine(engine_name, prev_context, menu_name):
     # context and move on.
     if scene_path == "":
         if prev_context != tank.platform.current_engine().context:
-            current_engine.change_context(ctx)
+            current_engine.change_context(prev_context)
         return
 
     # determine the tk instance and ctx to use:
@@ -105,10 +218,10 @@ def refresh_engine(engine_name, prev_context, menu_name):
     # loading a scene file
     new_path = os.path.abspath(os.path.join(scene_path, scene_name))
 
-    # this file could be in another project altogether, so create a new
-    # API instance.
+    # this file could be in another project altogether, so get the API
+    # instance of its pipeline configuration.
     try:
-        tk = tank.tank_from_path(new_path)
+        tk = current_engine.tk_pool.get(new_path)
         # and construct the new context for this path:
         ctx = tk.context_from_path(new_path, prev_context)
     except tank.TankError:
@@ -131,7 +244,7 @@ def refresh_engine(engine_name, prev_context, menu_name):
 
     # shotgun menu may have been removed, so add it back in if its not already
     # there.
-    current_engine.create_shotgun_menu()
+    current_engine.create_shotgun_menu(force=True)
 
     if ctx != tank.platform.current_engine().context:
         current_engine.change_context(ctx)
@@ -144,6 +257,12 @@ class CinemaEngine(Engine):
     Toolkit engine for Cinema.
     """
 
+    # Lock protecting the creation of the log sink.
+    _log_sink_lock = threading.Lock()
+
+    # Minimum number of seconds between two saves of the document contexts.
+    DOCUMENT_CONTEXT_SAVE_INTERVAL = 30
+
     def __get_platform_resource_path(self, filename):
         """
         Returns the full path to the given platform resource file or folder.
@@ -252,19 +371,113 @@ class CinemaEngine(Engine):
             pass
         return host_info
 
+    @property
+    def startup_profiler(self):
+        """
+        The :class:`StartupProfiler` timing the startup of the engine.
+        """
+        if getattr(self, "_startup_profiler", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._startup_profiler = tk_cinema.StartupProfiler()
+            # phases timed before the profiler could be created
+            for timing in getattr(self, "_init_timings", []):
+                self._startup_profiler.record(*timing)
+        return self._startup_profiler
+
+    def finish_startup_profiling(self):
+        """
+        Writes the startup timeline to the log folder and logs its summary.
+        """
+        try:
+            path = self.startup_profiler.finish(
+                LogManager().log_folder,
+                {
+                    "cinema_version": self.host_info["version"],
+                    "engine_version": self.version,
+                    "context": str(self.context),
+                },
+            )
+        except (IOError, OSError) as e:
+            # profiling must never get in the way of the startup
+            self.logger.debug("Could not write the startup timeline: %s", e)
+            return
+
+        if path:
+            self.logger.info(
+                "%s\nStartup timeline written to '%s'",
+                self.startup_profiler.summary(),
+                path,
+            )
+
+    @property
+    def commands_generation(self):
+        """
+        Counter incremented every time a command is registered, allowing
+        indexes of the engine commands to detect when they are outdated.
+        """
+        return getattr(self, "_commands_generation", 0)
+
+    @property
+    def command_names(self):
+        """
+        Dictionary mapping the names commands were registered with to the
+        names the engine stored them under, which differ when a name was
+        already taken.
+        """
+        if getattr(self, "_command_names", None) is None:
+            self._command_names = {}
+        return self._command_names
+
+    @property
+    def command_dispatcher(self):
+        """
+        The :class:`CommandDispatcher` running the engine commands from the
+        Cinema command plugins.
+        """
+        if getattr(self, "_command_dispatcher", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._command_dispatcher = tk_cinema.CommandDispatcher(self)
+        return self._command_dispatcher
+
+    def register_command(self, name, callback, properties=None):
+        """
+        Registers a command with the engine. While apps are initialized, the
+        time elapsed since the previous registration is credited to the app
+        registering the command.
+        """
+        known_names = set(self.commands)
+        super(CinemaEngine, self).register_command(name, callback, properties)
+
+        self._commands_generation = self.commands_generation + 1
+        added_names = set(self.commands) - known_names
+        stored_name = added_names.pop() if added_names else name
+        self.command_names[name] = stored_name
+
+        command = self.commands.get(stored_name)
+        app = command["properties"].get("app") if command else None
+        if app and getattr(self, "_startup_profiler", None):
+            self._startup_profiler.checkpoint(app.instance_name)
+
     def pre_app_init(self):
         """
         Runs after the engine is set up but before any apps have been
         initialized.
         """
-        # unicode characters returned by the shotgun api need to be converted
-        # to display correctly in all of the app windows
-        from tank.platform.qt import QtCore
-
-        # tell QT to interpret C strings as utf-8
-        utf8 = QtCore.QTextCodec.codecForName("utf-8")
-        QtCore.QTextCodec.setCodecForCStrings(utf8)
-        self.logger.debug("set utf-8 codec for widget text")
+        # tk_cinema is only imported once Toolkit has set up Qt, so the
+        # profiler is created here rather than in init_engine
+        with self.startup_profiler.phase("pre_app_init"):
+            # unicode characters returned by the shotgun api need to be
+            # converted to display correctly in all of the app windows
+            from tank.platform.qt import QtCore
+
+            # tell QT to interpret C strings as utf-8
+            utf8 = QtCore.QTextCodec.codecForName("utf-8")
+            QtCore.QTextCodec.setCodecForCStrings(utf8)
+            self.logger.debug("set utf-8 codec for widget text")
+
+        # time the initialization of the apps until post_app_init
+        self._startup_profiler.start("app init")
+        self._startup_profiler.start_checkpoints()
 
     def init_engine(self):
         """
@@ -272,6 +485,11 @@ class CinemaEngine(Engine):
         """
         self.logger.debug("%s: Initializing...", self)
 
+        # the startup profiler is not available yet, init_engine phases are
+        # recorded as (name, start, wall, cpu) tuples
+        self._init_timings = []
+        init_start = (time.time(), time.process_time())
+
         # check that we are running an ok version of cinema
         current_os = sys.platform.lower()
         if current_os not in ["darwin", "win32", "linux64"]:
@@ -342,7 +560,9 @@ class CinemaEngine(Engine):
                 os.environ["SHOTGUN_SKIP_QTWEBENGINEWIDGETS_IMPORT"] = "1"
 
         # add qt paths and dlls
+        pyside_start = (time.time(), time.process_time())
         self._init_pyside()
+        self._init_timings.append(_timing("_init_pyside", pyside_start))
 
         # default menu name is Shotgun but this can be overriden
         # in the configuration to be Sgtk in case of conflicts
@@ -350,19 +570,29 @@ class CinemaEngine(Engine):
         if self.get_setting("use_sgtk_as_menu_name", False):
             self._menu_name = "Sgtk"
 
-    def create_shotgun_menu(self):
+        self._init_timings.append(_timing("init_engine", init_start))
+
+    def create_shotgun_menu(self, force=False):
         """
         Creates the main shotgun menu in cinema.
         Note that this only creates the menu, not the child actions
+        :param bool force: Rebuild the menu even if it did not change since
+                           it was last built.
         :return: bool
         """
 
         # only create the shotgun menu if not in batch mode and menu doesn't
         # already exist
         if self.has_ui:
-            # create our menu handler
-            tk_cinema = self.import_module("tk_cinema")
-            self._menu_generator = tk_cinema.MenuGenerator(self, self._menu_name)
+            # create our menu handler, it is kept so that the menu is only
+            # rebuilt when it changed.
+            if getattr(self, "_menu_generator", None) is None:
+                tk_cinema = self.import_module("tk_cinema")
+                self._menu_generator = tk_cinema.MenuGenerator(
+                    self, self._menu_name
+                )
+            if force:
+                self._menu_generator.invalidate()
             self._menu_generator.create_menu()
 
             return True
@@ -391,13 +621,60 @@ class CinemaEngine(Engine):
         """
         Called when all apps have initialized
         """
-        self._initialise_qapplication()
+        self._startup_profiler.stop_checkpoints()
+        self._startup_profiler.stop("app init")
 
-        # for some readon this engine command get's lost so we add it back
-        self.__register_reload_command()
+        with self._startup_profiler.phase("post_app_init"):
+            self._initialise_qapplication()
+
+            # for some readon this engine command get's lost so we add it back
+            self.__register_reload_command()
+
+            # Run a series of app instance commands at startup.
+            self._run_app_instance_commands()
+
+    @staticmethod
+    def context_signature(context):
+        """
+        Returns a cheap, hashable signature of the entities a context points
+        to. Contexts with the same signature are equivalent for the engine,
+        for example the contexts of two versions of a work file.
+
+        :param context: :class:`~sgtk.Context` instance or None.
+        """
+        if context is None:
+            return None
+
+        def entity_key(entity):
+            return (entity.get("type"), entity.get("id")) if entity else None
+
+        return (
+            entity_key(context.project),
+            entity_key(context.entity),
+            entity_key(context.step),
+            entity_key(context.task),
+            tuple(sorted(entity_key(e) for e in context.additional_entities)),
+        )
+
+    def change_context(self, new_context):
+        """
+        Changes the context of the engine, unless the new context is
+        equivalent to the current one, in which case the apps are kept
+        running and the menu untouched.
 
-        # Run a series of app instance commands at startup.
-        self._run_app_instance_commands()
+        :param new_context: The new context to change to.
+        """
+        if self.context_signature(new_context) == self.context_signature(
+            self.context
+        ):
+            self.logger.debug(
+                "Context %s is equivalent to the current one, skipping "
+                "context change.",
+                new_context,
+            )
+            return
+
+        super(CinemaEngine, self).change_context(new_context)
 
     def post_context_change(self, old_context, new_context):
         """
@@ -426,7 +703,9 @@ class CinemaEngine(Engine):
             )
 
             # finally create the menu with the new context if needed
-            if old_context != new_context:
+            if self.context_signature(old_context) != self.context_signature(
+                new_context
+            ):
                 self.create_shotgun_menu()
 
     def _run_app_instance_commands(self):
@@ -450,12 +729,20 @@ class CinemaEngine(Engine):
 
         # Run the series of app instance commands listed in the
         # 'run_at_startup' setting.
+        # The commands are run one at a time once Cinema will have completed
+        # its UI update and be idle, in order to run them after the ones that
+        # restore the persisted Shotgun app panels.
+        tk_cinema = self.import_module("tk_cinema")
+        scheduler = tk_cinema.StartupScheduler(self.logger)
+
         for app_setting_dict in self.get_setting("run_at_startup", []):
 
             app_instance_name = app_setting_dict["app_instance"]
             # Menu name of the command to run or '' to run all commands of the
             # given app instance.
             setting_command_name = app_setting_dict["name"]
+            priority = app_setting_dict.get("priority", 0)
+            delay = app_setting_dict.get("delay", 0)
 
             # Retrieve the command dictionary of the given app instance.
             command_dict = app_instance_commands.get(app_instance_name)
@@ -470,35 +757,36 @@ class CinemaEngine(Engine):
             else:
                 if not setting_command_name:
                     # Run all commands of the given app instance.
-                    # Run these commands once Cinema will have completed its
-                    # UI update and be idle in order to run them after the ones
-                    # that restore the persisted Shotgun app panels.
                     for (
                         command_name,
                         command_function,
                     ) in command_dict.items():
                         self.logger.debug(
-                            "%s startup running app '%s' command '%s'.",
+                            "%s startup scheduling app '%s' command '%s'.",
                             self.name,
                             app_instance_name,
                             command_name,
                         )
-                        command_function()
+                        scheduler.add(
+                            command_name, command_function, priority, delay
+                        )
                 else:
                     # Run the command whose name is listed in the
                     # 'run_at_startup' setting.
-                    # Run this command once Cinema will have completed its
-                    # UI update and be idle in order to run it after the ones
-                    # that restore the persisted Shotgun app panels.
                     command_function = command_dict.get(setting_command_name)
                     if command_function:
                         self.logger.debug(
-                            "%s startup running app '%s' command '%s'.",
+                            "%s startup scheduling app '%s' command '%s'.",
                             self.name,
                             app_instance_name,
                             setting_command_name,
                         )
-                        command_function()
+                        scheduler.add(
+                            setting_command_name,
+                            command_function,
+                            priority,
+                            delay,
+                        )
                     else:
                         known_commands = ", ".join(
                             "'%s'" % name for name in command_dict
@@ -515,68 +803,152 @@ class CinemaEngine(Engine):
                             known_commands,
                         )
 
+        scheduler.start()
+
     def destroy_engine(self):
         """
         Stops watching scene events and tears down menu.
         """
         self.logger.debug("%s: Destroying...", self)
 
+        if getattr(self, "_log_sink", None) is not None:
+            self._log_sink.flush()
+
+        if getattr(self, "_context_switcher", None) is not None:
+            self._context_switcher.cancel()
+
+        if "DOCUMENT_CONTEXT_CACHE" in getattr(c4d, "_shotgun_cache", {}):
+            cache = c4d._shotgun_cache["DOCUMENT_CONTEXT_CACHE"]
+            self.logger.debug("Document context cache: %s", cache.stats)
+            try:
+                cache.save()
+            except (IOError, OSError) as e:
+                self.logger.debug("Could not persist document contexts: %s", e)
+
     def _init_pyside(self):
         """
         Handles the pyside init
+
+        The working binding and the path it was imported from are cached on
+        disk for the running Cinema build and interpreter, so the detection
+        only runs again once the cached binding stops importing.
         """
+        cache_path = os.path.join(self.cache_location, "qt_binding.json")
+        cache_key = "%s|%s|%s" % (
+            c4d.GetC4DVersion(),
+            sys.executable,
+            sys.version.split()[0],
+        )
 
-        # first see if pyside2 is present
         try:
-            from PySide2 import QtGui
-        except:
-            # fine, we don't expect PySide2 to be present just yet
-            self.logger.debug("PySide2 not detected - trying for PySide now...")
-        else:
-            # looks like pyside2 is already working! No need to do anything
+            with open(cache_path, "r") as fh:
+                cache = json.load(fh)
+        except (IOError, OSError, ValueError):
+            cache = {}
+
+        cached = cache.get(cache_key)
+        if cached:
+            path = cached["path"]
+            added = path and path not in sys.path
+            if added:
+                sys.path.append(path)
+
+            if self.__import_qt_binding(cached["binding"]):
+                self.logger.debug(
+                    "%s detected from cache - the existing version will be "
+                    "used.",
+                    cached["binding"],
+                )
+                return
+
             self.logger.debug(
-                "PySide2 detected - the existing version will be used."
+                "Cached %s setup can no longer be imported - detecting Qt "
+                "binding again...",
+                cached["binding"],
             )
+            if added:
+                sys.path.remove(path)
+
+        (binding, path) = self.__detect_pyside()
+        if not binding:
             return
 
-        # then see if pyside is present
+        cache[cache_key] = {"binding": binding, "path": path}
         try:
-            from PySide import QtGui
-        except:
-            # must be that a PySide version is not installed,
+            ensure_folder_exists(os.path.dirname(cache_path))
+            with open(cache_path, "w") as fh:
+                json.dump(cache, fh)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not cache Qt binding: %s", e)
+
+    def __import_qt_binding(self, binding):
+        """
+        Returns True if the given Qt binding can be imported.
+        """
+        try:
+            importlib.import_module("%s.QtGui" % binding)
+        except Exception:
+            return False
+        return True
+
+    def __detect_pyside(self):
+        """
+        Looks for a working PySide binding, adding the Shotgun Desktop one
+        to the path if needed.
+
+        :returns: A tuple with the name of the binding and the path added to
+                  import it, or None values if no binding could be found.
+        """
+
+        # first see if pyside2 is present
+        if self.__import_qt_binding("PySide2"):
+            # looks like pyside2 is already working! No need to do anything
             self.logger.debug(
-                "PySide not detected - it will be added to the setup now..."
+                "PySide2 detected - the existing version will be used."
             )
-        else:
+            return ("PySide2", None)
+
+        # fine, we don't expect PySide2 to be present just yet
+        self.logger.debug("PySide2 not detected - trying for PySide now...")
+
+        # then see if pyside is present
+        if self.__import_qt_binding("PySide"):
             # looks like pyside is already working! No need to do anything
             self.logger.debug(
                 "PySide detected - the existing version will be used."
             )
-            return
+            return ("PySide", None)
+
+        # must be that a PySide version is not installed,
+        self.logger.debug(
+            "PySide not detected - it will be added to the setup now..."
+        )
 
         current_os = sys.platform.lower()
         if current_os == "darwin":
             desktop_path = os.environ.get("SHOTGUN_DESKTOP_INSTALL_PATH",
                                           "/Applications/Shotgun.app")
-            sys.path.append(os.path.join(desktop_path, "Contents", "Resources",
-                                         "Python", "lib", "python2.7",
-                                         "site-packages"))
+            site_path = os.path.join(desktop_path, "Contents", "Resources",
+                                     "Python", "lib", "python2.7",
+                                     "site-packages")
 
         elif current_os == "win32":
             desktop_path = os.environ.get("SHOTGUN_DESKTOP_INSTALL_PATH",
                                           "C:/Program Files/Shotgun")
-            sys.path.append(os.path.join(desktop_path,
-                                         "Python", "Lib", "site-packages"))
+            site_path = os.path.join(desktop_path,
+                                     "Python", "Lib", "site-packages")
 
-        elif current_os == "linux2":
+        elif current_os.startswith("linux"):
             desktop_path = os.environ.get("SHOTGUN_DESKTOP_INSTALL_PATH",
                                           "/opt/Shotgun/Shotgun")
-            sys.path.append(os.path.join(desktop_path,
-                                         "Python", "Lib", "site-packages"))
-
+            site_path = os.path.join(desktop_path,
+                                     "Python", "Lib", "site-packages")
 
         else:
             self.logger.error("Unknown platform - cannot initialize PySide!")
+            return (None, None)
+
+        sys.path.append(site_path)
 
         # now try to import it
         try:
@@ -588,6 +960,9 @@ class CinemaEngine(Engine):
                 "operate correctly! Error reported: %s",
                 exception,
             )
+            return (None, None)
+
+        return ("PySide", site_path)
 
     def _get_dialog_parent(self):
         """
@@ -622,28 +997,14 @@ class CinemaEngine(Engine):
         #     Shotgun <basename>: <message>
         # where "basename" is the leaf part of the logging record name,
         # for example "tk-multi-shotgunpanel" or "qt_importer".
-        if record.levelno < logging.INFO:
-            formatter = logging.Formatter(
-                "Debug: Shotgun %(basename)s: %(message)s"
-            )
-        else:
-            formatter = logging.Formatter("Shotgun %(basename)s: %(message)s")
-
-        msg = formatter.format(record)
-
-        # Select Cinema display function to use according to the logging
-        # record level.
-        if record.levelno >= logging.ERROR:
-            fct = display_error
-        elif record.levelno >= logging.WARNING:
-            fct = display_warning
-        elif record.levelno >= logging.INFO:
-            fct = display_info
-        else:
-            fct = display_debug
-
-        # Display the message in Cinema script editor in a thread safe manner
-        self.async_execute_in_main_thread(fct, msg)
+        # Messages are displayed in Cinema script editor in batches, from the
+        # main thread.
+        if getattr(self, "_log_sink", None) is None:
+            # messages can be logged from several threads
+            with self._log_sink_lock:
+                if getattr(self, "_log_sink", None) is None:
+                    self._log_sink = CinemaLogSink(self)
+        self._log_sink.emit(record)
 
     def close_windows(self):
         """
@@ -676,26 +1037,253 @@ class CinemaEngine(Engine):
 
     def _init_shotgun_cache(self):
         if not hasattr(c4d, '_shotgun_cache'):
-            c4d._shotgun_cache = {'DOCUMENT_CONTEXT_MAP': {}}
+            c4d._shotgun_cache = {}
+
+        # the cache is stored on the c4d module so that it survives engine
+        # restarts within the same Cinema session.
+        if 'DOCUMENT_CONTEXT_CACHE' not in c4d._shotgun_cache:
+            tk_cinema = self.import_module("tk_cinema")
+            cache = tk_cinema.DocumentContextCache(
+                max_size=self.get_setting("document_context_cache_size", 256),
+                ttl=self.get_setting("document_context_cache_ttl", 604800),
+                path=os.path.join(
+                    self.cache_location, "document_context_cache.json"
+                ),
+                validator=self._is_document_context_payload,
+            )
+            cache.load()
+            c4d._shotgun_cache['DOCUMENT_CONTEXT_CACHE'] = cache
+
+    @staticmethod
+    def _is_document_context_payload(payload):
+        '''Whether a persisted payload has the shape stored by
+        set_document_context or _set_document_context_failed.'''
+
+        if not isinstance(payload, dict):
+            return False
+        if payload.get("failed") is True:
+            return True
+        return isinstance(payload.get("pc_path"), str) and isinstance(
+            payload.get("context"), dict
+        )
+
+    @property
+    def document_context_cache(self):
+        """
+        The :class:`DocumentContextCache` storing the contexts of the Cinema
+        documents opened in this session.
+        """
+        self._init_shotgun_cache()
+        return c4d._shotgun_cache['DOCUMENT_CONTEXT_CACHE']
+
+    @property
+    def command_registry(self):
+        """
+        The :class:`CommandRegistry` holding the Cinema plugin ids of the
+        engine commands. Ids are shared by all the projects of the machine.
+        """
+        if getattr(self, "_command_registry", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._command_registry = tk_cinema.CommandRegistry(
+                path=os.path.join(
+                    LocalFileStorageManager.get_global_root(
+                        LocalFileStorageManager.CACHE
+                    ),
+                    "tk-cinema",
+                    "command_ids.json",
+                ),
+                seed=[
+                    (name, plugin_id)
+                    for name, plugin_id, place in (
+                        tk_cinema.constant_apps.menu_prebuild
+                    )
+                    if place != "separator"
+                ],
+                logger=self.logger,
+            )
+        return self._command_registry
+
+    @property
+    def tk_pool(self):
+        """
+        The :class:`TankInstancePool` reusing Toolkit API instances across
+        the documents of a session.
+        """
+        if getattr(self, "_tk_pool", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._tk_pool = tk_cinema.TankInstancePool()
+            self._tk_pool.add(self.sgtk)
+        return self._tk_pool
+
+    @property
+    def events(self):
+        """
+        The :class:`EventBus` publishing Cinema document events to the engine,
+        hooks and apps.
+        """
+        if getattr(self, "_events", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._events = tk_cinema.EventBus(self.logger)
+            self._events.subscribe(
+                self._events.DOCUMENT_ACTIVATED, self._on_document_changed
+            )
+            self._events.subscribe(
+                self._events.DOCUMENT_SAVED, self._on_document_changed
+            )
+        return self._events
+
+    def _on_document_changed(self, path):
+        """
+        Switches to the context of the active document when its path changed.
+        """
+        if path == getattr(self, "_document_path", None):
+            return
+        self._document_path = path
+
+        if self.get_setting("automatic_context_switch", True):
+            # the context is resolved in the background and only the last
+            # document of a burst of changes is switched to.
+            self.context_switcher.request(path)
+
+    @property
+    def process_manager(self):
+        """
+        The :class:`ProcessManager` launching external processes without
+        blocking Cinema.
+        """
+        if getattr(self, "_process_manager", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._process_manager = tk_cinema.ProcessManager(self.logger)
+        return self._process_manager
+
+    @property
+    def publish_copier(self):
+        """
+        The :class:`FileCopier` copying large files to the publish area.
+        """
+        if getattr(self, "_publish_copier", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._publish_copier = tk_cinema.FileCopier(
+                self.logger,
+                chunk_size=self.get_setting("publish_copy_chunk_size", 32) * 1048576,
+                max_workers=self.get_setting("publish_copy_workers", 4),
+            )
+        return self._publish_copier
+
+    @property
+    def context_switcher(self):
+        """
+        The :class:`ContextSwitcher` following the active Cinema document.
+        """
+        if getattr(self, "_context_switcher", None) is None:
+            tk_cinema = self.import_module("tk_cinema")
+            self._context_switcher = tk_cinema.ContextSwitcher(
+                self, self.get_setting("context_switch_delay", 300) / 1000.0
+            )
+        return self._context_switcher
 
     def get_document_context(self, doc_path):
         '''Retrieve a shotgun context using a document's file path.
 
-        Falls back to tk.context_from_path.
+        Falls back to context_from_path with the Toolkit instance of the
+        document's pipeline configuration, taken from the tk_pool, which is
+        given the number of seconds set by the context_resolution_timeout
+        setting to complete.
+        Returns None when no context can be determined for the document.
+        Failed lookups are remembered so they are not attempted again before
+        document_context_negative_ttl seconds.
         '''
 
-        self._init_shotgun_cache()
-
         cache_key = doc_path.replace('\\', '/').lower()
-        if cache_key in c4d._shotgun_cache['DOCUMENT_CONTEXT_MAP']:
-            return c4d._shotgun_cache['DOCUMENT_CONTEXT_MAP'][cache_key]
+        payload = self.document_context_cache.get(cache_key)
+        if payload:
+            if payload.get("failed"):
+                return None
+            tk = self.tk_pool.find(payload["pc_path"])
+            if tk is not None:
+                try:
+                    return tank.Context.from_dict(tk, payload["context"])
+                except (KeyError, TypeError, ValueError, tank.TankError) as e:
+                    # an unusable entry is resolved again
+                    self.logger.debug(
+                        "Discarding cached context of '%s': %s", doc_path, e
+                    )
+
+        if not hasattr(self, "_context_resolver"):
+            tk_cinema = self.import_module("tk_cinema")
+            self._context_resolver = tk_cinema.ContextResolver(
+                self._on_document_context_resolved,
+                self._on_document_context_timeout,
+            )
+
+        (_, context, _) = self._context_resolver.resolve(
+            cache_key,
+            self._context_from_path,
+            self.get_setting("context_resolution_timeout", 5.0),
+            doc_path,
+        )
+        return context
+
+    def _context_from_path(self, doc_path):
+        '''Determine the context of a document with the Toolkit instance of
+        the pipeline configuration it belongs to, which may be the one of
+        another project.'''
+
+        try:
+            tk = self.tk_pool.get(doc_path)
+        except tank.TankError as e:
+            self.logger.debug(
+                "No pipeline configuration found for '%s': %s", doc_path, e
+            )
+            tk = self.sgtk
+        return tk.context_from_path(doc_path)
+
+    def _on_document_context_timeout(self, cache_key):
+        '''Remember a context lookup which exceeded its time budget.'''
+
+        # the failure is remembered until the lookup completes in the
+        # background and replaces it with its result.
+        self.logger.debug(
+            "Context lookup for '%s' exceeded its time budget.", cache_key
+        )
+        self._set_document_context_failed(cache_key)
+
+    def _on_document_context_resolved(self, cache_key, context, error):
+        '''Store the outcome of a context lookup run by the resolver.'''
+
+        if error is None:
+            self.set_document_context(cache_key, context)
         else:
-            return self.sgtk.context_from_path(doc_path)
+            self.logger.debug(
+                "Could not determine context from '%s': %s", cache_key, error
+            )
+            self._set_document_context_failed(cache_key)
+
+    def _set_document_context_failed(self, cache_key):
+        '''Remember that no context could be determined for a document.'''
+
+        self.document_context_cache.set(
+            cache_key,
+            {"failed": True},
+            ttl=self.get_setting("document_context_negative_ttl", 300),
+        )
 
     def set_document_context(self, doc_path, context):
         '''Store a shotgun context using a document's file path.'''
 
-        self._init_shotgun_cache()
-
         cache_key = doc_path.replace('\\', '/').lower()
-        c4d._shotgun_cache['DOCUMENT_CONTEXT_MAP'][cache_key] = context
+        cache = self.document_context_cache
+        cache.set(
+            cache_key,
+            {
+                "pc_path": context.sgtk.pipeline_configuration.get_path(),
+                "context": context.to_dict(),
+            },
+        )
+
+        # the cache is also saved when the engine is destroyed, so a burst of
+        # lookups only writes it once.
+        try:
+            cache.save(min_interval=self.DOCUMENT_CONTEXT_SAVE_INTERVAL)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not persist document contexts: %s", e)
@@ -9,8 +9,12 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 import os
+import re
 import c4d
 import glob
+import json
+from array import array
+from concurrent import futures
 
 import sgtk
 
@@ -20,6 +24,19 @@ __contact__ = "https://www.linkedin.com/in/mykhailo-datsyk/"
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# Maximum number of threads classifying the files found in a folder.
+SCAN_WORKERS = 8
+
+# Name of the scan manifest written to the work area.
+SCAN_MANIFEST_NAME = ".tk-cinema_scan.json"
+
+# Splits what follows the render prefix of a frame file name into pass
+# suffix, frame number and extension.
+FRAME_REGEX = re.compile(r"^(.*?)(\d+)(\.[^.]+)$")
+
+# Item types of the files collected as rendered images.
+RENDER_ITEM_TYPES = ("file.image", "file.texture")
+
 
 class CinemaSessionCollector(HookBaseClass):
     """
@@ -61,6 +78,13 @@ class CinemaSessionCollector(HookBaseClass):
                                "to publish plugins via the collected item's "
                                "properties. ",
             },
+            "Scan Depth": {
+                "type": "int",
+                "default": 2,
+                "description": "Number of subfolder levels searched below the "
+                               "movies and alembic cache folders. 0 only "
+                               "searches the folders themselves.",
+            },
         }
 
         # update the base settings with these settings
@@ -82,8 +106,16 @@ class CinemaSessionCollector(HookBaseClass):
         item = self.collect_current_cinema_session(settings, parent_item)
         project_root = doc.GetDocumentPath()
 
-        self.collect_playblasts(item, project_root)
-        self.collect_alembic_caches(item, project_root)
+        # folders which did not change since the previous collection are
+        # taken from the scan manifest
+        self._scan_manifest = self._load_scan_manifest(project_root)
+
+        scan_depth = settings["Scan Depth"].value
+        self.collect_playblasts(item, project_root, scan_depth)
+        self.collect_alembic_caches(item, project_root, scan_depth)
+        self.collect_render_outputs(item, doc)
+
+        self._save_scan_manifest(project_root, self._scan_manifest)
 
     def collect_current_cinema_session(self, settings, parent_item):
         """
@@ -147,7 +179,7 @@ class CinemaSessionCollector(HookBaseClass):
 
         return session_item
 
-    def collect_playblasts(self, parent_item, project_root):
+    def collect_playblasts(self, parent_item, project_root, scan_depth=0):
         """
         Creates items for quicktime playblasts.
 
@@ -156,6 +188,7 @@ class CinemaSessionCollector(HookBaseClass):
 
         :param parent_item: Parent Item instance
         :param str project_root: The maya project root to search for playblasts
+        :param int scan_depth: Number of subfolder levels to search
         """
 
         # ensure the movies dir exists
@@ -173,16 +206,7 @@ class CinemaSessionCollector(HookBaseClass):
         )
 
         # look for movie files in the movies folder
-        for filename in os.listdir(movies_dir):
-
-            # do some early pre-processing to ensure the file is of the right
-            # type. use the base class item info method to see what the item
-            # type would be.
-            item_info = self._get_item_info(filename)
-            if item_info["item_type"] != "file.video":
-                continue
-
-            movie_path = os.path.join(movies_dir, filename)
+        for movie_path in self._find_files(movies_dir, "file.video", scan_depth):
 
             # allow the base class to collect and create the item. it knows how
             # to handle movie files
@@ -195,7 +219,7 @@ class CinemaSessionCollector(HookBaseClass):
             # the an indication of what it is and why it was collected
             item.name = "%s (%s)" % (item.name, "playblast")
 
-    def collect_alembic_caches(self, parent_item, project_root):
+    def collect_alembic_caches(self, parent_item, project_root, scan_depth=0):
         """
         Creates items for alembic caches
 
@@ -204,6 +228,7 @@ class CinemaSessionCollector(HookBaseClass):
 
         :param parent_item: Parent Item instance
         :param str project_root: The maya project root to search for alembics
+        :param int scan_depth: Number of subfolder levels to search
         """
 
         # ensure the alembic cache dir exists
@@ -221,19 +246,376 @@ class CinemaSessionCollector(HookBaseClass):
         )
 
         # look for alembic files in the cache folder
-        for filename in os.listdir(cache_dir):
-            cache_path = os.path.join(cache_dir, filename)
-
-            # do some early pre-processing to ensure the file is of the right
-            # type. use the base class item info method to see what the item
-            # type would be.
-            item_info = self._get_item_info(filename)
-            if item_info["item_type"] != "file.alembic":
-                continue
+        for cache_path in self._find_files(cache_dir, "file.alembic", scan_depth):
 
             # allow the base class to collect and create the item. it knows how
             # to handle alembic files
             super(CinemaSessionCollector, self)._collect_file(
                 parent_item,
                 cache_path
-            )
\ No newline at end of file
+            )
+
+    def collect_render_outputs(self, parent_item, doc):
+        """
+        Creates items for the image sequences rendered from the document.
+
+        The regular and multipass save paths of the active render data are
+        resolved, and the frames found next to them are grouped into one item
+        per sequence, with its frame ranges and missing frames.
+
+        :param parent_item: Parent Item instance
+        :param doc: The Cinema document to collect render outputs from
+        """
+        render_data = doc.GetActiveRenderData()
+        if render_data is None:
+            return
+
+        render_paths = []
+        if render_data[c4d.RDATA_SAVEIMAGE]:
+            render_paths.append(render_data[c4d.RDATA_PATH])
+        if render_data[c4d.RDATA_MULTIPASS_SAVEIMAGE]:
+            render_paths.append(render_data[c4d.RDATA_MULTIPASS_FILENAME])
+
+        # render paths sharing a folder are grouped with one listing
+        prefixes = {}
+        for render_path in render_paths:
+            render_path = self._resolve_render_path(doc, render_data, render_path)
+            if not render_path:
+                continue
+            (folder, name) = os.path.split(render_path)
+            prefixes.setdefault(folder, set()).add(os.path.splitext(name)[0])
+
+        for folder in sorted(prefixes):
+            for (seq_path, frames, padding) in self._find_sequences(
+                folder, prefixes[folder]
+            ):
+                self._collect_render_sequence(parent_item, seq_path, frames, padding)
+
+    def _resolve_render_path(self, doc, render_data, render_path):
+        """
+        Returns the absolute path of a render save path, with its tokens
+        resolved, or None.
+        """
+        if not render_path:
+            return None
+
+        if "$" in render_path:
+            try:
+                render_path = c4d.modules.tokensystem.FilenameConvertTokens(
+                    render_path,
+                    {
+                        "_doc": doc,
+                        "_rData": render_data,
+                        "_rBc": render_data.GetDataInstance(),
+                        "_frame": doc.GetTime().GetFrame(doc.GetFps()),
+                    },
+                )
+            except (AttributeError, TypeError) as e:
+                self.logger.debug(
+                    "Could not resolve render path %s: %s" % (render_path, e)
+                )
+                return None
+
+        if not os.path.isabs(render_path):
+            render_path = os.path.join(doc.GetDocumentPath(), render_path)
+
+        return os.path.normpath(render_path)
+
+    def _extensions_for(self, item_types):
+        """
+        Returns the lower case extensions, with their leading dot, the base
+        class associates with the given item types.
+        """
+        extensions = set()
+        for file_info in self.common_file_info.values():
+            if file_info["item_type"] in item_types:
+                extensions.update(
+                    ".%s" % extension.lower() for extension in file_info["extensions"]
+                )
+        return extensions
+
+    def _find_sequences(self, folder, prefixes):
+        """
+        Groups the image frames of a folder whose name starts with one of the
+        given prefixes into sequences. The frame number is taken from what
+        follows the prefix, so prefixes ending with digits are kept intact.
+
+        :param str folder: Folder to search.
+        :param set prefixes: File name prefixes of the render outputs.
+        :returns: Sorted list of (sequence path, sorted frames array, padding)
+                  tuples, the sequence path using a printf style frame spec.
+        """
+        try:
+            names = [entry.name for entry in os.scandir(folder) if entry.is_file()]
+        except OSError as e:
+            self.logger.debug("Could not scan %s: %s" % (folder, e))
+            return []
+
+        extensions = self._extensions_for(RENDER_ITEM_TYPES)
+        # the longest prefix wins when several of them match a name
+        prefixes = sorted(prefixes, key=len, reverse=True)
+        sequences = {}
+        for name in names:
+            if os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            for render_prefix in prefixes:
+                if name.startswith(render_prefix):
+                    break
+            else:
+                continue
+            match = FRAME_REGEX.match(name[len(render_prefix):])
+            if not match:
+                continue
+            (suffix, frame, extension) = match.groups()
+            prefix = render_prefix + suffix
+            sequences.setdefault(
+                (prefix, extension, len(frame)), array("l")
+            ).append(int(frame))
+
+        results = []
+        for (prefix, extension, padding) in sorted(sequences):
+            frames = array("l", sorted(sequences[(prefix, extension, padding)]))
+            seq_path = os.path.join(
+                folder, "%s%%0%dd%s" % (prefix, padding, extension)
+            )
+            results.append((seq_path, frames, padding))
+        return results
+
+    def _collect_render_sequence(self, parent_item, seq_path, frames, padding):
+        """
+        Creates the item of a rendered image sequence.
+
+        :param parent_item: Parent Item instance
+        :param str seq_path: Path of the sequence with a printf style frame spec
+        :param frames: Sorted array of the frame numbers found on disk
+        :param int padding: Number of digits of the frame numbers
+        """
+        frame_ranges = _compact_ranges(frames)
+        missing_ranges = _compact_ranges(_missing_frames(frames))
+
+        display_name = "%s (%s)" % (
+            os.path.basename(seq_path).replace("%%0%dd" % padding, "#" * padding),
+            "render",
+        )
+        item = parent_item.create_item(
+            "file.image.sequence", "Rendered Image Sequence", display_name
+        )
+        item.set_icon_from_path(
+            self._get_item_info(seq_path % frames[0])["icon_path"]
+        )
+
+        item.properties["path"] = seq_path
+        item.properties["sequence_paths"] = [seq_path % frame for frame in frames]
+        item.properties["first_frame"] = frames[0]
+        item.properties["last_frame"] = frames[-1]
+        item.properties["frame_ranges"] = frame_ranges
+        item.properties["missing_frames"] = missing_ranges
+
+        if missing_ranges:
+            self.logger.warning(
+                "Render sequence %s is missing frames %s" % (seq_path, missing_ranges)
+            )
+        self.logger.info(
+            "Collected render sequence %s, frames %s" % (seq_path, frame_ranges),
+            extra={
+                "action_show_folder": {
+                    "path": os.path.dirname(seq_path)
+                }
+            }
+        )
+
+        return item
+
+    def _find_files(self, folder, item_type, scan_depth):
+        """
+        Returns the sorted paths of the files of the given item type found in
+        a folder and its subfolders.
+
+        Files are first filtered on the extensions the base class associates
+        with the item type, then classified by a pool of threads. Folders
+        whose modification time and entry count match the scan manifest are
+        not classified again, and only the new files of changed folders are.
+
+        :param str folder: Folder to search.
+        :param str item_type: Item type of the files to return.
+        :param int scan_depth: Number of subfolder levels to search.
+        :returns: List of file paths.
+        """
+        manifest = getattr(self, "_scan_manifest", None)
+        if manifest is None:
+            manifest = {}
+
+        extensions = self._extensions_for((item_type,))
+
+        paths = []
+        candidates = []
+        folders = [(folder, 0)]
+        while folders:
+            (current, depth) = folders.pop()
+            try:
+                mtime = os.stat(current).st_mtime
+                entries = list(os.scandir(current))
+            except OSError as e:
+                self.logger.debug("Could not scan %s: %s" % (current, e))
+                continue
+
+            scanned = manifest.get(current)
+            if (
+                scanned
+                and scanned["mtime"] == mtime
+                and scanned["entries"] == len(entries)
+            ):
+                # the folder did not change, reuse its previous scan
+                sub_folders = scanned["folders"]
+                paths.extend(
+                    os.path.join(current, name)
+                    for (name, file_type) in scanned["files"].items()
+                    if file_type == item_type
+                )
+            else:
+                known_files = scanned["files"] if scanned else {}
+                sub_folders = []
+                files = {}
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            sub_folders.append(entry.name)
+                        elif os.path.splitext(entry.name)[1].lower() in extensions:
+                            if entry.name in known_files:
+                                files[entry.name] = known_files[entry.name]
+                                if files[entry.name] == item_type:
+                                    paths.append(entry.path)
+                            else:
+                                files[entry.name] = None
+                                candidates.append(entry.path)
+                    except OSError:
+                        continue
+
+                scanned = {
+                    "mtime": mtime,
+                    "entries": len(entries),
+                    "folders": sub_folders,
+                    "files": files,
+                }
+                manifest[current] = scanned
+
+            if depth < scan_depth:
+                folders.extend(
+                    (os.path.join(current, name), depth + 1) for name in sub_folders
+                )
+
+        if candidates:
+            # do some early pre-processing to ensure the files are of the right
+            # type. use the base class item info method to see what the item
+            # type would be.
+            with futures.ThreadPoolExecutor(
+                max_workers=min(SCAN_WORKERS, len(candidates))
+            ) as executor:
+                item_infos = list(executor.map(self._get_item_info, candidates))
+
+            for (path, item_info) in zip(candidates, item_infos):
+                (dir_path, name) = os.path.split(path)
+                manifest[dir_path]["files"][name] = item_info["item_type"]
+                if item_info["item_type"] == item_type:
+                    paths.append(path)
+
+        return sorted(paths)
+
+    def _load_scan_manifest(self, project_root):
+        """
+        Reads the scan manifest of the previous collection in a work area.
+
+        Malformed entries, e.g. written by another version of the collector,
+        are discarded and their folders scanned again.
+
+        :param str project_root: The work area folder.
+        :returns: Dictionary of scanned folders, keyed by their path.
+        """
+        if not project_root:
+            return {}
+        try:
+            with open(os.path.join(project_root, SCAN_MANIFEST_NAME), "r") as fh:
+                manifest = json.load(fh)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        if not isinstance(manifest, dict):
+            return {}
+        return dict(
+            (folder, scanned)
+            for (folder, scanned) in manifest.items()
+            if _is_scanned_folder(scanned)
+        )
+
+    def _save_scan_manifest(self, project_root, manifest):
+        """
+        Writes the scan manifest of a work area for the next collection.
+
+        :param str project_root: The work area folder.
+        :param dict manifest: Dictionary of scanned folders.
+        """
+        if not project_root or not manifest:
+            return
+        path = os.path.join(project_root, SCAN_MANIFEST_NAME)
+        try:
+            tmp_path = "%s.%s.tmp" % (path, os.getpid())
+            with open(tmp_path, "w") as fh:
+                json.dump(manifest, fh)
+            os.replace(tmp_path, path)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not save the scan manifest: %s" % (e,))
+
+
+def _is_scanned_folder(scanned):
+    """
+    Returns True if a scan manifest entry has the shape written by
+    :meth:`CinemaSessionCollector._find_files`.
+    """
+    if not isinstance(scanned, dict):
+        return False
+    mtime = scanned.get("mtime")
+    entries = scanned.get("entries")
+    folders = scanned.get("folders")
+    files = scanned.get("files")
+    if isinstance(mtime, bool) or not isinstance(mtime, (int, float)):
+        return False
+    if isinstance(entries, bool) or not isinstance(entries, int):
+        return False
+    if not isinstance(folders, list) or not all(
+        isinstance(name, str) for name in folders
+    ):
+        return False
+    if not isinstance(files, dict):
+        return False
+    return all(
+        isinstance(name, str) and (file_type is None or isinstance(file_type, str))
+        for (name, file_type) in files.items()
+    )
+
+
+def _missing_frames(frames):
+    """
+    Returns the frames missing between the first and last of a sorted array
+    of frames.
+    """
+    missing = array("l")
+    for (previous, frame) in zip(frames, frames[1:]):
+        if frame - previous > 1:
+            missing.extend(range(previous + 1, frame))
+    return missing
+
+
+def _compact_ranges(frames):
+    """
+    Returns a sorted array of frames as a compact list of ranges, e.g.
+    ``1001-1040,1043-1100``.
+    """
+    ranges = []
+    start = None
+    for (index, frame) in enumerate(frames):
+        if start is None:
+            start = frame
+        if index + 1 == len(frames) or frames[index + 1] != frame + 1:
+            ranges.append(str(frame) if frame == start else "%d-%d" % (start, frame))
+            start = None
+    return ",".join(ranges)
\ No newline at end of file
@@ -13,7 +13,7 @@ import c4d
 from contextlib import contextmanager
 
 import sgtk
-from sgtk.util.filesystem import ensure_folder_exists
+from sgtk.util.filesystem import copy_file, ensure_folder_exists
 
 
 __author__ = "Mykhailo Datsyk"
@@ -127,7 +127,20 @@ class CinemaSessionPublishPlugin(HookBaseClass):
                 "description": "Template path for published work files. Should"
                 "correspond to a template defined in "
                 "templates.yml.",
-            }
+            },
+            "Publish Checksum": {
+                "type": "bool",
+                "default": True,
+                "description": "Compute a checksum of the session while it is "
+                "copied to the publish area. Without it, the copy is left to "
+                "the operating system where possible.",
+            },
+            "Publish Checksum Field": {
+                "type": "str",
+                "default": None,
+                "description": "Optional PublishedFile field the checksum is "
+                "registered in, as '<algorithm>:<hex digest>'.",
+            },
         }
 
         # update the base settings
@@ -260,12 +273,11 @@ class CinemaSessionPublishPlugin(HookBaseClass):
         (next_version_path, version) = self._get_next_version_info(path, item)
         if next_version_path and os.path.exists(next_version_path):
 
-            # determine the next available version_number. just keep asking for
-            # the next one until we get one that doesn't exist.
-            while os.path.exists(next_version_path):
-                (next_version_path, version) = self._get_next_version_info(
-                    next_version_path, item
-                )
+            # determine the next available version_number, following the
+            # highest version found on disk.
+            (next_version_path, version) = self._get_next_available_version_info(
+                path, item
+            )
 
             error_msg = "The next version of this file already exists on disk."
             self.logger.error(
@@ -315,8 +327,10 @@ class CinemaSessionPublishPlugin(HookBaseClass):
         # are appropriate for current os, no double separators, etc.
         path = sgtk.util.ShotgunPath.normalize(_session_path())
 
-        # ensure the session is saved
-        _save_session(path)
+        # ensure the session is saved. the other copies of the session made
+        # during the publish are made from this file.
+        if not _save_session_once(item, path):
+            self.logger.debug("Session has no unsaved changes, skipping save.")
 
         # update the item with the saved session path
         item.properties["path"] = path
@@ -339,7 +353,152 @@ class CinemaSessionPublishPlugin(HookBaseClass):
         super(CinemaSessionPublishPlugin, self).finalize(settings, item)
 
         # bump the session file to the next version
-        self._save_to_next_version(item.properties["path"], item, _save_session)
+        self._save_to_next_version(
+            item.properties["path"],
+            item,
+            lambda next_version_path: _copy_session(item, next_version_path),
+        )
+
+    def _get_next_available_version_info(self, path, item):
+        """
+        Return the path and version number following the highest version of
+        the supplied path found on disk.
+
+        The versions are found from a single listing of the path folder,
+        parsed with the work template if it matches the path or with the path
+        info hook otherwise.
+
+        :param path: The path to the current session
+        :param item: Item to process
+
+        :return: A tuple of the form (next_version_path, version)
+        """
+
+        publisher = self.parent
+        folder = os.path.dirname(path)
+
+        work_template = item.properties.get("work_template")
+        if work_template and not work_template.validate(path):
+            work_template = None
+
+        if work_template:
+            fields = work_template.get_fields(path)
+            highest_version = fields.pop("version", None)
+            fields = _normcase_fields(fields)
+        else:
+            family = os.path.normcase(publisher.util.get_version_path(path, "v000"))
+            highest_version = publisher.util.get_version_number(path)
+
+        highest_path = path
+        highest_version = highest_version or 0
+
+        for name in _folder_listing(item, folder):
+            candidate = os.path.join(folder, name)
+
+            if work_template:
+                if not work_template.validate(candidate):
+                    continue
+                candidate_fields = work_template.get_fields(candidate)
+                version = candidate_fields.pop("version", None)
+                if _normcase_fields(candidate_fields) != fields:
+                    continue
+            else:
+                version = publisher.util.get_version_number(candidate)
+                if (
+                    version is None
+                    or os.path.normcase(
+                        publisher.util.get_version_path(candidate, "v000")
+                    )
+                    != family
+                ):
+                    continue
+
+            if version is not None and version > highest_version:
+                (highest_path, highest_version) = (candidate, version)
+
+        return self._get_next_version_info(highest_path, item)
+
+    def _copy_work_to_publish(self, settings, item):
+        """
+        Copies the session file to the publish template path.
+
+        The copy is made by the engine publish copier, which copies the file
+        in parallel chunks, checksums it and writes it atomically.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+                         the keys returned in the settings property.
+                         The values are `Setting` instances.
+        :param item: Item to process
+        """
+
+        publisher = self.parent
+        copier = getattr(publisher.engine, "publish_copier", None)
+        if copier is None:
+            return super(CinemaSessionPublishPlugin, self)._copy_work_to_publish(
+                settings, item
+            )
+
+        work_template = item.properties.get("work_template")
+        if not work_template:
+            self.logger.debug(
+                "No work template set on the item. "
+                "Skipping copy file to publish location."
+            )
+            return
+
+        publish_template = item.properties.get("publish_template")
+        if not publish_template:
+            self.logger.debug(
+                "No publish template set on the item. "
+                "Skipping copying file to publish location."
+            )
+            return
+
+        work_file = item.properties["path"]
+        if not work_template.validate(work_file):
+            self.logger.warning(
+                "Work file '%s' did not match work template '%s'. "
+                "Publishing in place." % (work_file, work_template)
+            )
+            return
+
+        work_fields = work_template.get_fields(work_file)
+        missing_keys = publish_template.missing_keys(work_fields)
+        if missing_keys:
+            self.logger.warning(
+                "Work file '%s' missing keys required for the publish "
+                "template: %s" % (work_file, missing_keys)
+            )
+            return
+
+        publish_file = publish_template.apply_fields(work_fields)
+
+        try:
+            result = copier.copy(
+                work_file, publish_file, checksum=settings["Publish Checksum"].value
+            )
+        except Exception as e:
+            raise Exception(
+                "Failed to copy work file from '%s' to '%s'.\nError: %s"
+                % (work_file, publish_file, e)
+            )
+
+        if result["checksum"]:
+            checksum = "%s:%s" % (result["checksum_algorithm"], result["checksum"])
+            item.properties["publish_checksum"] = checksum
+            self.logger.info("Publish file checksum: %s" % (checksum,))
+
+            # the base plugin registers the publish fields with the publish
+            checksum_field = settings["Publish Checksum Field"].value
+            if checksum_field:
+                publish_fields = dict(item.properties.get("publish_fields") or {})
+                publish_fields[checksum_field] = checksum
+                item.properties["publish_fields"] = publish_fields
+
+        self.logger.debug(
+            "Copied work file '%s' to publish file '%s' at %.1f MB/s."
+            % (work_file, publish_file, result["throughput"] / 1048576.0)
+        )
 
 
 def _session_path():
@@ -366,6 +525,85 @@ def _save_session(path):
     c4d.documents.SaveDocument(doc, path, c4d.SAVEDOCUMENTFLAGS_NONE, c4d.FORMAT_C4DEXPORT)
 
 
+def _save_session_once(item, path):
+    """
+    Save the current session to the supplied path, unless it is already saved
+    there without changes, and remember it as the saved session of the item.
+
+    :returns: True if the session was saved, False if the save was skipped.
+    """
+    doc = c4d.documents.GetActiveDocument()
+    session_path = _session_path()
+
+    saved = False
+    if (
+        doc.GetChanged()
+        or not session_path
+        or os.path.normpath(session_path) != os.path.normpath(path)
+        or not os.path.exists(path)
+    ):
+        _save_session(path)
+        saved = True
+
+    item.properties["saved_session_path"] = path
+    return saved
+
+
+def _copy_session(item, path):
+    """
+    Make the supplied path the current session by copying the session saved
+    earlier in the publish, saving the session if there is none.
+    """
+    source = item.properties.get("saved_session_path")
+    if not source or not os.path.exists(source):
+        _save_session(path)
+        return
+
+    # Ensure that the folder is created when copying
+    folder, file = os.path.split(path)
+    ensure_folder_exists(folder)
+    copy_file(source, path)
+
+    doc = c4d.documents.GetActiveDocument()
+    doc.SetDocumentName(file)
+    doc.SetDocumentPath(folder)
+
+
+def _folder_listing(item, folder):
+    """
+    Return the names of the files in the supplied folder. Listings are kept on
+    the item for the publish session and only refreshed when the folder
+    modification time changes.
+    """
+    try:
+        mtime = os.stat(folder).st_mtime
+    except OSError:
+        return set()
+
+    listings = item.properties.get("folder_listings") or {}
+    listing = listings.get(folder)
+    if not listing or listing[0] != mtime:
+        try:
+            listing = (mtime, set(os.listdir(folder)))
+        except OSError:
+            return set()
+        listings[folder] = listing
+        item.properties["folder_listings"] = listings
+
+    return listing[1]
+
+
+def _normcase_fields(fields):
+    """
+    Return template fields with their string values case normalized for the
+    current os, so that they compare like the paths they come from.
+    """
+    return dict(
+        (key, os.path.normcase(value) if isinstance(value, str) else value)
+        for (key, value) in fields.items()
+    )
+
+
 # TODO: method duplicated in all the cinema hooks
 def _get_save_as_action():
     """
@@ -13,7 +13,7 @@ import c4d
 from contextlib import contextmanager
 
 import sgtk
-from sgtk.util.filesystem import ensure_folder_exists
+from sgtk.util.filesystem import copy_file, ensure_folder_exists
 
 
 __author__ = "Mykhailo Datsyk"
@@ -218,13 +218,15 @@ class CinemaStartVersionControlPlugin(HookBaseClass):
         path = sgtk.util.ShotgunPath.normalize(_session_path())
 
         # ensure the session is saved in its current state
-        _save_session(path)
+        if not _save_session_once(item, path):
+            self.logger.debug("Session has no unsaved changes, skipping save.")
 
         # get the path to a versioned copy of the file.
         version_path = publisher.util.get_version_path(path, "v001")
 
-        # save to the new version path
-        _save_session(version_path)
+        # copy the saved session to the new version path
+        _copy_session(item, version_path)
+        item.properties["saved_session_path"] = version_path
         self.logger.info(
             "A version number has been added to the Cinema file..."
         )
@@ -311,6 +313,50 @@ def _save_session(path):
     c4d.documents.SaveDocument(doc, path, c4d.SAVEDOCUMENTFLAGS_NONE, c4d.FORMAT_C4DEXPORT)
 
 
+def _save_session_once(item, path):
+    """
+    Save the current session to the supplied path, unless it is already saved
+    there without changes, and remember it as the saved session of the item.
+
+    :returns: True if the session was saved, False if the save was skipped.
+    """
+    doc = c4d.documents.GetActiveDocument()
+    session_path = _session_path()
+
+    saved = False
+    if (
+        doc.GetChanged()
+        or not session_path
+        or os.path.normpath(session_path) != os.path.normpath(path)
+        or not os.path.exists(path)
+    ):
+        _save_session(path)
+        saved = True
+
+    item.properties["saved_session_path"] = path
+    return saved
+
+
+def _copy_session(item, path):
+    """
+    Make the supplied path the current session by copying the session saved
+    earlier in the publish, saving the session if there is none.
+    """
+    source = item.properties.get("saved_session_path")
+    if not source or not os.path.exists(source):
+        _save_session(path)
+        return
+
+    # Ensure that the folder is created when copying
+    folder, file = os.path.split(path)
+    ensure_folder_exists(folder)
+    copy_file(source, path)
+
+    doc = c4d.documents.GetActiveDocument()
+    doc.SetDocumentName(file)
+    doc.SetDocumentPath(folder)
+
+
 # TODO: method duplicated in all the cinema hooks
 def _get_save_as_action():
     """
@@ -95,11 +95,15 @@ class SceneOperation(HookClass):
             return doc[c4d.DOCUMENT_FILEPATH]
         elif operation == "open":
             c4d.documents.LoadFile(file_path)
+            engine.events.emit(engine.events.DOCUMENT_ACTIVATED, path=file_path)
         elif operation in ("save", "save_as"):
             folder, file = os.path.split(file_path)
             doc.SetDocumentName(file)
             doc.SetDocumentPath(folder)
             c4d.documents.SaveDocument(doc, file_path, c4d.SAVEDOCUMENTFLAGS_NONE, c4d.FORMAT_C4DEXPORT)
+            # unchanged documents saved to a new path are not detected by
+            # the engine, so notify it of the save.
+            engine.events.emit(engine.events.DOCUMENT_SAVED, path=file_path)
         elif operation == "reset":
             if doc.GetChanged():
                 response = c4d.gui.QuestionDialog(
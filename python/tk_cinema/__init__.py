@@ -9,3 +9,12 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 from .menu_generation import MenuGenerator
+from .context_cache import DocumentContextCache, ContextResolver
+from .context_switch import ContextSwitcher
+from .tk_pool import TankInstancePool
+from .startup_scheduler import StartupScheduler
+from .startup_profiler import StartupProfiler
+from .command_registry import CommandRegistry, CommandDispatcher
+from .event_bus import EventBus
+from .process_manager import ProcessManager
+from .file_copy import FileCopier
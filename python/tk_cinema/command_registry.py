@@ -0,0 +1,169 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Cinema plugin ids of the engine commands
+
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from sgtk.util.filesystem import ensure_folder_exists
+
+
+class CommandRegistry(object):
+    """
+    Persisted mapping between command names and the ids of the Cinema command
+    plugins running them.
+
+    Ids are assigned once per command name and kept on disk, so that menus
+    and layouts referring to them remain valid across sessions. New ids are
+    derived from the md5 hash of the command name, truncated to 7 digits, and
+    collisions between truncated hashes are resolved by probing the next
+    free id.
+    """
+
+    def __init__(self, path=None, seed=None, logger=None):
+        """
+        :param str path: Optional json file used to persist the ids.
+        :param seed: Optional list of (name, id) tuples whose ids take
+                     precedence over the persisted ones.
+        :param logger: Optional logger reporting id collisions.
+        """
+        self._path = path
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = {}
+
+        for name, plugin_id in seed or []:
+            self._add(name, int(plugin_id))
+
+        for name, plugin_id in self._load().items():
+            if name not in self._ids and plugin_id not in self._names:
+                self._add(name, plugin_id)
+
+    def id_for(self, name):
+        """
+        Returns the plugin id of a command, assigning a new one if needed.
+
+        :param str name: Name of the command.
+        :returns: The plugin id as an int.
+        """
+        plugin_id = self._ids.get(name)
+        if plugin_id is not None:
+            return plugin_id
+
+        with self._lock:
+            if name not in self._ids:
+                self._add(name, self._new_id(name))
+                self._save()
+            return self._ids[name]
+
+    def _add(self, name, plugin_id):
+        self._ids[name] = plugin_id
+        self._names[plugin_id] = name
+
+    def _new_id(self, name):
+        digest = hashlib.md5(name.encode("utf-8")).hexdigest()
+        plugin_id = int(str(int(digest, 16))[0:7])
+        while plugin_id in self._names:
+            if self._logger:
+                self._logger.warning(
+                    "Command '%s' plugin id %d is already used by '%s', "
+                    "trying the next one.",
+                    name,
+                    plugin_id,
+                    self._names[plugin_id],
+                )
+            plugin_id += 1
+        return plugin_id
+
+    def _load(self):
+        if not self._path or not os.path.exists(self._path):
+            return {}
+        try:
+            with open(self._path, "r") as fh:
+                return dict(
+                    (name, int(plugin_id))
+                    for name, plugin_id in json.load(fh).items()
+                )
+        except (IOError, OSError, ValueError) as e:
+            if self._logger:
+                self._logger.debug("Could not read command ids: %s", e)
+            return {}
+
+    def _save(self):
+        if not self._path:
+            return
+        try:
+            ensure_folder_exists(os.path.dirname(self._path))
+            tmp_path = "%s.%s.tmp" % (self._path, os.getpid())
+            with open(tmp_path, "w") as fh:
+                json.dump(self._ids, fh, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._path)
+        except (IOError, OSError) as e:
+            if self._logger:
+                self._logger.debug("Could not persist command ids: %s", e)
+
+
+class CommandDispatcher(object):
+    """
+    Runs engine commands by the name they were registered with.
+
+    The callbacks are looked up in an index which is only rebuilt when the
+    engine registered new commands, and the time each command takes is
+    logged.
+    """
+
+    def __init__(self, engine):
+        """
+        :param engine: The running :class:`CinemaEngine`.
+        """
+        self._engine = engine
+        self._index = {}
+        self._generation = None
+
+    def _rebuild(self):
+        commands = self._engine.commands
+        index = dict(
+            (name, command["callback"]) for name, command in commands.items()
+        )
+        for name, stored_name in self._engine.command_names.items():
+            if stored_name in commands:
+                index.setdefault(name, commands[stored_name]["callback"])
+
+        self._index = index
+        self._generation = self._engine.commands_generation
+
+    def dispatch(self, name):
+        """
+        Runs the command registered under the given name.
+
+        :param str name: Name of the command.
+        :returns: True if a command was run, False otherwise.
+        """
+        if self._generation != self._engine.commands_generation:
+            self._rebuild()
+
+        callback = self._index.get(name)
+        if callback is None:
+            return False
+
+        start = time.time()
+        callback()
+        self._engine.logger.debug(
+            "Command '%s' dispatched in %.3fs.", name, time.time() - start
+        )
+        return True
@@ -8,17 +8,9 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
-# Menu Id"s generated with simple function
-# def get_plugins():
-#     out = []
-#     for item in engine.commands.items():
-#         tmp = [item]
-#         m = hashlib.md5()
-#         m.update(item[0])
-#         plug_id = str(int(m.hexdigest(), 16))[0:7]
-#         tmp.append(plug_id)
-#         out.append(tmp)
-#     return out
+# Menu Id"s generated from the md5 hash of the command names, truncated to
+# 7 digits. They seed the persisted CommandRegistry, which assigns the ids of
+# the commands missing from this list.
 
 menu_prebuild = [
      ["Separator", "0", "separator"],
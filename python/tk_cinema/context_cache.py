@@ -0,0 +1,296 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Bounded document context cache for Cinema
+
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+
+from sgtk.util.filesystem import ensure_folder_exists
+
+
+class DocumentContextCache(object):
+    """
+    Thread safe LRU cache mapping Cinema document paths to serialized
+    Shotgun contexts.
+
+    Entries expire after ``ttl`` seconds, or after the ttl given when they were
+    stored, and the least recently used entry is evicted once ``max_size``
+    entries are stored. The cache can be persisted to a json file so that a
+    new Cinema session starts with the contexts resolved by the previous ones.
+    """
+
+    def __init__(self, max_size=256, ttl=86400, path=None, validator=None):
+        """
+        :param int max_size: Maximum number of entries kept in the cache.
+        :param int ttl: Number of seconds an entry stays valid.
+        :param str path: Optional json file used to persist the cache.
+        :param validator: Optional callable returning True for the persisted
+                          payloads which can be used, the others being
+                          discarded when the cache is loaded.
+        """
+        self._max_size = max(1, max_size)
+        self._ttl = ttl
+        self._path = path
+        self._validator = validator
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._saved_at = 0
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self):
+        """
+        Dictionary with the hit, miss and eviction counters of the cache.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def get(self, key):
+        """
+        Returns the payload stored for the given key or None if there is no
+        valid entry for it.
+
+        :param str key: Normalized document path.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry[0], entry[2]):
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, payload, ttl=None):
+        """
+        Stores a payload for the given key, evicting the least recently used
+        entries if the cache is full.
+
+        :param str key: Normalized document path.
+        :param payload: Json serializable data to store.
+        :param int ttl: Optional number of seconds the entry stays valid,
+                        overriding the ttl of the cache.
+        """
+        with self._lock:
+            self._entries[key] = (time.time(), payload, ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all the entries of the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def load(self):
+        """
+        Reads the entries persisted on disk, discarding the expired and
+        malformed ones.
+        """
+        if not self._path or not os.path.exists(self._path):
+            return
+
+        try:
+            with open(self._path, "r") as fh:
+                entries = json.load(fh)
+        except (IOError, OSError, ValueError):
+            # a corrupted cache is not worth more than a cold start
+            return
+
+        if not isinstance(entries, list):
+            return
+
+        with self._lock:
+            for entry in entries:
+                if not self._is_valid(entry):
+                    continue
+                key, timestamp, payload = entry[:3]
+                ttl = entry[3] if len(entry) > 3 else None
+                if key in self._entries or self._is_expired(timestamp, ttl):
+                    continue
+                self._entries[key] = (timestamp, payload, ttl)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def save(self, min_interval=0):
+        """
+        Writes the valid entries of the cache to disk.
+
+        Saves are serialized within the process and each one writes a unique
+        temporary file, so concurrent saves, from this or another Cinema
+        session, never interleave their writes.
+
+        :param float min_interval: Number of seconds during which the cache is
+                                   not written again after a save.
+        """
+        if not self._path:
+            return
+
+        with self._save_lock:
+            if min_interval and time.time() - self._saved_at < min_interval:
+                return
+
+            with self._lock:
+                entries = [
+                    [key, timestamp, payload, ttl]
+                    for key, (timestamp, payload, ttl) in self._entries.items()
+                    if key and not self._is_expired(timestamp, ttl)
+                ]
+
+            folder = os.path.dirname(self._path)
+            ensure_folder_exists(folder)
+            (fd, tmp_path) = tempfile.mkstemp(
+                suffix=".tmp", prefix=os.path.basename(self._path), dir=folder
+            )
+            try:
+                with os.fdopen(fd, "w") as fh:
+                    json.dump(entries, fh)
+                os.replace(tmp_path, self._path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._saved_at = time.time()
+
+    def _is_valid(self, entry):
+        number = (int, float)
+        if not isinstance(entry, list) or len(entry) not in (3, 4):
+            return False
+        if not isinstance(entry[0], str) or not entry[0]:
+            return False
+        if isinstance(entry[1], bool) or not isinstance(entry[1], number):
+            return False
+        if len(entry) == 4 and entry[3] is not None and (
+            isinstance(entry[3], bool) or not isinstance(entry[3], number)
+        ):
+            return False
+        if self._validator is None:
+            return True
+        try:
+            return bool(self._validator(entry[2]))
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def _is_expired(self, timestamp, ttl=None):
+        if ttl is None:
+            ttl = self._ttl
+        return ttl > 0 and time.time() - timestamp > ttl
+
+
+class ContextResolver(object):
+    """
+    Runs context lookups in worker threads, giving each caller a time budget
+    to wait for the result.
+
+    Lookups for the same key share the same worker thread, and a callback is
+    invoked from the worker once a lookup completes, even when its caller
+    stopped waiting for it. Whether a lookup timed out or completed is
+    decided under a lock, so the timeout callback always runs before the
+    completion callback of the same lookup.
+    """
+
+    def __init__(self, callback=None, timeout_callback=None):
+        """
+        :param callback: Optional callable invoked with the key, the result
+                         and the exception raised (or None) when a lookup
+                         completes.
+        :param timeout_callback: Optional callable invoked with the key when
+                                 a caller stops waiting for a lookup which is
+                                 still running.
+        """
+        self._callback = callback
+        self._timeout_callback = timeout_callback
+        self._lock = threading.Lock()
+        self._workers = {}
+
+    def resolve(self, key, func, timeout, *args):
+        """
+        Calls ``func(*args)`` in a worker thread and waits for its result.
+
+        :param str key: Key identifying the lookup.
+        :param func: Callable performing the lookup.
+        :param float timeout: Number of seconds to wait for the lookup.
+
+        :returns: A tuple ``(done, result, error)`` where ``done`` is False if
+                  the lookup did not complete within the time budget.
+        """
+        with self._lock:
+            worker = self._workers.get(key)
+            if worker is None:
+                worker = _ResolutionWorker(self, key, func, args)
+                self._workers[key] = worker
+                worker.start()
+
+        worker.join(timeout)
+        with self._lock:
+            # the worker unregisters itself once its result is set
+            pending = self._workers.get(key) is worker
+            if pending and self._timeout_callback:
+                self._timeout_callback(key)
+
+        if pending:
+            return (False, None, None)
+        return (True, worker.result, worker.error)
+
+    def _complete(self, worker):
+        with self._lock:
+            if self._workers.get(worker.key) is worker:
+                del self._workers[worker.key]
+
+        if self._callback:
+            self._callback(worker.key, worker.result, worker.error)
+
+
+class _ResolutionWorker(threading.Thread):
+    """
+    Worker thread running a single lookup for a :class:`ContextResolver`.
+    """
+
+    def __init__(self, resolver, key, func, args):
+        super(_ResolutionWorker, self).__init__(name="tk-cinema context")
+        self.daemon = True
+        self.key = key
+        self.result = None
+        self.error = None
+        self._resolver = resolver
+        self._func = func
+        self._args = args
+
+    def run(self):
+        try:
+            self.result = self._func(*self._args)
+        except Exception as e:
+            self.error = e
+        self._resolver._complete(self)
@@ -0,0 +1,102 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Debounced context switching for Cinema documents
+
+"""
+
+import threading
+
+
+class ContextSwitcher(object):
+    """
+    Switches the engine context to the one of the active Cinema document.
+
+    Requests are debounced so that a burst of document changes only resolves
+    the context of the last document. The context is resolved in a worker
+    thread and applied in the main thread, unless a newer request was made
+    in the meantime.
+    """
+
+    def __init__(self, engine, delay=0.3):
+        """
+        :param engine: The running :class:`CinemaEngine`.
+        :param float delay: Number of seconds to wait for further requests
+                            before resolving the context.
+        """
+        self._engine = engine
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._timer = None
+
+    def request(self, doc_path):
+        """
+        Schedules a switch to the context of the given document, superseding
+        any pending or in-flight switch.
+
+        :param str doc_path: Path of the active Cinema document.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(
+                self._delay, self._resolve, args=(self._generation, doc_path)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """
+        Discards any pending or in-flight switch.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    def _resolve(self, generation, doc_path):
+        """
+        Resolves the context of the document. Runs in the timer thread.
+        """
+        if self._is_stale(generation):
+            return
+
+        # failures are logged and remembered by the engine
+        context = self._engine.get_document_context(doc_path)
+        if context is None or self._is_stale(generation):
+            return
+
+        self._engine.async_execute_in_main_thread(
+            self._apply, generation, doc_path, context
+        )
+
+    def _apply(self, generation, doc_path, context):
+        """
+        Changes the engine context. Runs in the main thread.
+        """
+        if self._is_stale(generation) or context == self._engine.context:
+            return
+
+        try:
+            self._engine.change_context(context)
+        except Exception as e:
+            self._engine.logger.debug(
+                "Could not set context for '%s' (context: %s): %s",
+                doc_path,
+                context,
+                e,
+            )
@@ -0,0 +1,88 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Engine level event bus for Cinema
+
+"""
+
+import threading
+import traceback
+
+
+class EventBus(object):
+    """
+    Simple publish/subscribe mechanism allowing hooks and apps to be notified
+    of Cinema events without polling Cinema themselves.
+
+    Subscribers are called synchronously, in the thread emitting the event,
+    with the keyword arguments given to :meth:`emit`.
+    """
+
+    # A document became the active one, either because it was loaded or
+    # because the artist switched to it. Emitted with the document path.
+    DOCUMENT_ACTIVATED = "document_activated"
+
+    # The active document was saved, possibly to a new path. Emitted with the
+    # document path.
+    DOCUMENT_SAVED = "document_saved"
+
+    def __init__(self, logger):
+        """
+        :param logger: Logger reporting subscriber errors.
+        """
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, event, callback):
+        """
+        Subscribes a callback to an event.
+
+        :param str event: Name of the event.
+        :param callback: Callable receiving the keyword arguments of the
+                         event.
+        """
+        with self._lock:
+            callbacks = self._subscribers.setdefault(event, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+
+    def unsubscribe(self, event, callback):
+        """
+        Unsubscribes a callback from an event.
+
+        :param str event: Name of the event.
+        :param callback: Callable previously subscribed.
+        """
+        with self._lock:
+            callbacks = self._subscribers.get(event, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def emit(self, event, **kwargs):
+        """
+        Calls the subscribers of an event.
+
+        :param str event: Name of the event.
+        """
+        with self._lock:
+            callbacks = list(self._subscribers.get(event, []))
+
+        for callback in callbacks:
+            try:
+                callback(**kwargs)
+            except Exception:
+                self._logger.error(
+                    "Error in '%s' event subscriber %s:\n%s",
+                    event,
+                    callback,
+                    traceback.format_exc(),
+                )
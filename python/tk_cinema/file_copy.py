@@ -0,0 +1,226 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Chunked, checksummed copy of large published files
+
+"""
+
+import os
+import sys
+import time
+import hashlib
+import itertools
+import collections
+from concurrent import futures
+
+from sgtk.util.filesystem import ensure_folder_exists
+
+
+class FileCopier(object):
+    """
+    Copies large files in fixed size chunks written by a pool of threads.
+
+    The checksum is a standard digest of the whole file, computed as the
+    chunks are copied: chunks are hashed in order as soon as they are written,
+    while the next ones are copied, and at most ``max_workers + 1`` of them are
+    held in memory. The file is written to a temporary file next to the
+    destination, then renamed, so the destination never holds a partial copy.
+
+    When no checksum is requested the chunks are copied by the kernel with
+    ``copy_file_range`` or ``sendfile`` where available.
+    """
+
+    # Size of the reads and writes within a chunk.
+    BUFFER_SIZE = 4 * 1024 * 1024
+
+    # hashlib algorithm of the checksums.
+    CHECKSUM_ALGORITHM = "sha256"
+
+    def __init__(self, logger, chunk_size=32 * 1024 * 1024, max_workers=4):
+        """
+        :param logger: Logger reporting the copy throughput.
+        :param int chunk_size: Size of the chunks, in bytes.
+        :param int max_workers: Maximum number of chunks copied at the same
+                                time.
+        """
+        self._logger = logger
+        self._chunk_size = max(int(chunk_size), self.BUFFER_SIZE)
+        self._max_workers = max(int(max_workers), 1)
+
+    def copy(self, source, destination, checksum=True):
+        """
+        Copies a file.
+
+        :param str source: Path of the file to copy.
+        :param str destination: Path of the copy.
+        :param bool checksum: Whether to compute the checksum of the file.
+        :returns: Dictionary with the ``size``, ``seconds``, ``throughput`` in
+                  bytes per second, ``checksum`` hex digest and
+                  ``checksum_algorithm`` of the copy, the checksum being None
+                  if it was not requested.
+        """
+        start = time.time()
+        size = os.path.getsize(source)
+        chunks = [
+            (offset, min(self._chunk_size, size - offset))
+            for offset in range(0, size, self._chunk_size)
+        ]
+
+        folder = os.path.dirname(destination)
+        ensure_folder_exists(folder)
+        tmp_path = os.path.join(
+            folder, ".%s.%s.tmp" % (os.path.basename(destination), os.getpid())
+        )
+
+        try:
+            with open(tmp_path, "wb") as fh:
+                fh.truncate(size)
+
+            digest = None
+            if checksum:
+                digest = self._copy_hashed(source, tmp_path, chunks)
+            elif not self._copy_kernel(source, tmp_path, chunks):
+                self._map(self._copy_chunk, source, tmp_path, chunks)
+
+            if os.path.getsize(tmp_path) != size:
+                raise IOError(
+                    "Copy of '%s' has %d bytes, expected %d."
+                    % (source, os.path.getsize(tmp_path), size)
+                )
+
+            os.chmod(tmp_path, 0o666)
+            os.replace(tmp_path, destination)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        seconds = time.time() - start
+        throughput = size / seconds if seconds else 0.0
+        self._logger.debug(
+            "Copied '%s' to '%s': %.1f MB in %.2fs (%.1f MB/s).",
+            source,
+            destination,
+            size / 1048576.0,
+            seconds,
+            throughput / 1048576.0,
+        )
+        return {
+            "size": size,
+            "seconds": seconds,
+            "throughput": throughput,
+            "checksum": digest,
+            "checksum_algorithm": self.CHECKSUM_ALGORITHM,
+        }
+
+    def _map(self, func, source, destination, chunks):
+        if len(chunks) <= 1:
+            return [func(source, destination, chunk) for chunk in chunks]
+
+        with futures.ThreadPoolExecutor(
+            max_workers=min(self._max_workers, len(chunks))
+        ) as executor:
+            return list(
+                executor.map(lambda chunk: func(source, destination, chunk), chunks)
+            )
+
+    def _copy_hashed(self, source, destination, chunks):
+        """
+        Copies the chunks with a pool of threads and returns the hex digest of
+        the file, hashing the chunks in order as they complete.
+        """
+        digest = hashlib.new(self.CHECKSUM_ALGORITHM)
+        chunks = iter(chunks)
+        with futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            jobs = collections.deque(
+                executor.submit(self._copy_chunk, source, destination, chunk, True)
+                for chunk in itertools.islice(chunks, self._max_workers + 1)
+            )
+            while jobs:
+                buffers = jobs.popleft().result()
+                for chunk in itertools.islice(chunks, 1):
+                    jobs.append(
+                        executor.submit(
+                            self._copy_chunk, source, destination, chunk, True
+                        )
+                    )
+                for data in buffers:
+                    digest.update(data)
+        return digest.hexdigest()
+
+    def _copy_chunk(self, source, destination, chunk, keep_data=False):
+        """
+        Copies a chunk, returning the buffers read when keep_data is True.
+        """
+        (offset, length) = chunk
+        buffers = []
+        with open(source, "rb") as src, open(destination, "r+b") as dst:
+            src.seek(offset)
+            dst.seek(offset)
+            while length > 0:
+                data = src.read(min(self.BUFFER_SIZE, length))
+                if not data:
+                    raise IOError("'%s' was truncated while copied." % source)
+                dst.write(data)
+                if keep_data:
+                    buffers.append(data)
+                length -= len(data)
+            dst.flush()
+            os.fsync(dst.fileno())
+        return buffers
+
+    def _copy_kernel(self, source, destination, chunks):
+        """
+        Copies the chunks without reading them in Python. Returns False if the
+        platform or the file systems do not support it.
+        """
+        if hasattr(os, "copy_file_range"):
+            try:
+                self._map(self._copy_chunk_range, source, destination, chunks)
+                return True
+            except OSError as e:
+                self._logger.debug("copy_file_range is unavailable: %s", e)
+                return False
+
+        if sys.platform.startswith("linux") and hasattr(os, "sendfile"):
+            try:
+                with open(source, "rb") as src, open(destination, "r+b") as dst:
+                    for (offset, length) in chunks:
+                        while length > 0:
+                            sent = os.sendfile(
+                                dst.fileno(), src.fileno(), offset, length
+                            )
+                            if not sent:
+                                raise IOError(
+                                    "'%s' was truncated while copied." % source
+                                )
+                            offset += sent
+                            length -= sent
+                    os.fsync(dst.fileno())
+                return True
+            except OSError as e:
+                self._logger.debug("sendfile is unavailable: %s", e)
+                return False
+
+        return False
+
+    def _copy_chunk_range(self, source, destination, chunk):
+        (offset, length) = chunk
+        with open(source, "rb") as src, open(destination, "r+b") as dst:
+            while length > 0:
+                copied = os.copy_file_range(
+                    src.fileno(), dst.fileno(), length, offset, offset
+                )
+                if not copied:
+                    raise IOError("'%s' was truncated while copied." % source)
+                offset += copied
+                length -= copied
+            os.fsync(dst.fileno())
@@ -19,8 +19,6 @@ import os
 import unicodedata
 import traceback
 
-from tank.platform.qt import QtGui, QtCore
-
 import c4d
 from . import constant_apps
 
@@ -32,24 +30,48 @@ __contact__ = "https://www.linkedin.com/in/mykhailo-datsyk/"
 class MenuGenerator(object):
     """
     Menu generation functionality for Cinema
+
+    The generator keeps a model of the last menu it built, so that the menu
+    resource is only modified when the commands or the context label change.
     """
 
     def __init__(self, engine, menu_name):
         self._engine = engine
         self._menu_name = menu_name
+        self._model = None
+
+    def _build_model(self):
+        """
+        Returns a hashable description of the menu for the current state of
+        the engine.
+        """
+        return (
+            self._menu_name,
+            "{}".format(self._engine.context),
+            tuple(sorted(self._engine.commands)),
+            tuple(tuple(entry) for entry in constant_apps.menu_prebuild),
+        )
 
     def create_menu(self, *args):
+        model = self._build_model()
+        if model == self._model:
+            self._engine.logger.debug("Shotgun menu is up to date.")
+            return
+
+        self._model = model
+
         mainMenu = c4d.gui.GetMenuResource("M_EDITOR")
 
         for index, x in enumerate(mainMenu):
             if x[1][c4d.MENURESOURCE_SUBTITLE] == self._menu_name:
                 mainMenu.RemoveIndex(index)
+                break
 
         menu = c4d.BaseContainer()
         menu.InsData(c4d.MENURESOURCE_SUBTITLE, self._menu_name)
 
         submenu = c4d.BaseContainer()
-        submenu.InsData(c4d.MENURESOURCE_SUBTITLE, "{}".format(self._engine.context))
+        submenu.InsData(c4d.MENURESOURCE_SUBTITLE, model[1])
 
         for app, app_id, place in constant_apps.menu_prebuild:
             if "submenu" in place:
@@ -63,3 +85,9 @@ class MenuGenerator(object):
         mainMenu.InsData(c4d.MENURESOURCE_STRING, menu)
 
         c4d.gui.UpdateMenus()
+
+    def invalidate(self):
+        """
+        Forces the next call to create_menu to rebuild the menu.
+        """
+        self._model = None
@@ -0,0 +1,66 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Non blocking launch of external processes from Cinema
+
+"""
+
+import threading
+import subprocess
+
+
+class ProcessManager(object):
+    """
+    Launches external processes without blocking the Cinema UI.
+
+    Each launch is handled by a background thread which waits for the process
+    to exit and logs its exit code. At most ``max_processes`` processes run at
+    the same time, further launches wait for one of them to exit.
+    """
+
+    def __init__(self, logger, max_processes=4):
+        """
+        :param logger: Logger reporting the process exit codes.
+        :param int max_processes: Maximum number of processes running at the
+                                  same time.
+        """
+        self._logger = logger
+        self._slots = threading.BoundedSemaphore(max_processes)
+
+    def launch(self, args):
+        """
+        Launches a process in the background.
+
+        :param args: List of the program and arguments of the process, or a
+                     command line string, which is passed as is on Windows.
+        """
+        thread = threading.Thread(
+            target=self._run, args=(args,), name="tk-cinema process"
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, args):
+        with self._slots:
+            try:
+                process = subprocess.Popen(args)
+            except OSError as e:
+                self._logger.error("Failed to launch %s: %s", args, e)
+                return
+
+            exit_code = process.wait()
+
+        if exit_code != 0:
+            self._logger.error(
+                "Failed to launch %s! Exit code: %s", args, exit_code
+            )
+        else:
+            self._logger.debug("%s exited successfully.", args)
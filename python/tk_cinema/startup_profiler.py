@@ -0,0 +1,167 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Startup profiling for Cinema
+
+"""
+
+import os
+import json
+import time
+from contextlib import contextmanager
+
+from sgtk.util.filesystem import ensure_folder_exists
+
+
+class StartupProfiler(object):
+    """
+    Records the wall and cpu time of the engine startup phases and of the
+    initialization of each app.
+
+    App timings are taken from checkpoints: an app is credited with the time
+    elapsed between the previous checkpoint and its own, which the engine
+    takes whenever an app registers a command.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.apps = []
+        self._running = {}
+        self._checkpoint = None
+        self._finished = False
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager recording the time spent in its body as a phase.
+
+        :param str name: Name of the phase.
+        """
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def start(self, name):
+        """
+        Starts timing a phase.
+
+        :param str name: Name of the phase.
+        """
+        self._running[name] = (time.time(), time.process_time())
+
+    def stop(self, name):
+        """
+        Stops timing a phase started with :meth:`start`.
+
+        :param str name: Name of the phase.
+        """
+        if name not in self._running:
+            return
+        (start, cpu_start) = self._running.pop(name)
+        self.record(
+            name, start, time.time() - start, time.process_time() - cpu_start
+        )
+
+    def record(self, name, start, wall, cpu):
+        """
+        Records a phase timed outside of the profiler.
+
+        :param str name: Name of the phase.
+        :param float start: Start time of the phase, in seconds since epoch.
+        :param float wall: Wall time of the phase, in seconds.
+        :param float cpu: Process cpu time of the phase, in seconds.
+        """
+        self.phases.append(
+            {"name": name, "start": start, "wall": wall, "cpu": cpu}
+        )
+
+    def start_checkpoints(self):
+        """
+        Starts crediting the time elapsed between checkpoints to apps.
+        """
+        self._checkpoint = (time.time(), time.process_time())
+
+    def stop_checkpoints(self):
+        """
+        Stops crediting time to apps.
+        """
+        self._checkpoint = None
+
+    def checkpoint(self, app_name):
+        """
+        Credits the time elapsed since the previous checkpoint to an app.
+
+        :param str app_name: Instance name of the app.
+        """
+        if self._checkpoint is None:
+            return
+
+        (start, cpu_start) = self._checkpoint
+        now = (time.time(), time.process_time())
+        self._checkpoint = now
+
+        if self.apps and self.apps[-1]["name"] == app_name:
+            self.apps[-1]["wall"] += now[0] - start
+            self.apps[-1]["cpu"] += now[1] - cpu_start
+        else:
+            self.apps.append(
+                {
+                    "name": app_name,
+                    "start": start,
+                    "wall": now[0] - start,
+                    "cpu": now[1] - cpu_start,
+                }
+            )
+
+    def summary(self):
+        """
+        Returns a human readable summary of the recorded timings.
+        """
+        lines = ["Startup timeline (wall / cpu):"]
+        for phase in sorted(self.phases, key=lambda p: p["start"]):
+            lines.append(
+                "  %-28s %8.3fs / %8.3fs"
+                % (phase["name"], phase["wall"], phase["cpu"])
+            )
+        for app in self.apps:
+            lines.append(
+                "    app %-24s %8.3fs / %8.3fs"
+                % (app["name"], app["wall"], app["cpu"])
+            )
+        return "\n".join(lines)
+
+    def finish(self, folder, info=None):
+        """
+        Writes the timeline as a json file to the given folder. Only the first
+        call writes a timeline.
+
+        :param str folder: Folder to write the timeline to.
+        :param dict info: Additional information stored with the timeline.
+        :returns: The path of the written file or None.
+        """
+        if self._finished:
+            return None
+        self._finished = True
+
+        ensure_folder_exists(folder)
+        path = os.path.join(
+            folder,
+            "tk-cinema_startup_%s_%d.json"
+            % (time.strftime("%Y%m%d-%H%M%S"), os.getpid()),
+        )
+        data = dict(info or {})
+        data["phases"] = sorted(self.phases, key=lambda p: p["start"])
+        data["apps"] = self.apps
+        with open(path, "w") as fh:
+            json.dump(data, fh, indent=2)
+        return path
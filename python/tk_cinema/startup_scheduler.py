@@ -0,0 +1,88 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Idle time scheduling of the Cinema startup commands
+
+"""
+
+import time
+import traceback
+
+
+class StartupScheduler(object):
+    """
+    Runs startup tasks one at a time, whenever the Qt event loop is idle.
+
+    Tasks run by ascending priority, then in the order they were added. A
+    task can also be deferred so that it does not run before a given number
+    of milliseconds after the scheduler started.
+    """
+
+    def __init__(self, logger):
+        """
+        :param logger: Logger reporting the duration of each task.
+        """
+        self._logger = logger
+        self._tasks = []
+        self._started = None
+
+    def add(self, name, callback, priority=0, delay=0):
+        """
+        Adds a task to the scheduler.
+
+        :param str name: Name of the task, used for logging.
+        :param callback: Callable to run.
+        :param int priority: Tasks with a lower priority run first.
+        :param int delay: Minimum number of milliseconds between the start of
+                          the scheduler and the task run.
+        """
+        self._tasks.append((priority, len(self._tasks), delay, name, callback))
+        self._tasks.sort(key=lambda task: task[:2])
+
+    def start(self):
+        """
+        Starts running the tasks once Cinema is idle.
+        """
+        self._started = time.time()
+        self._schedule(0)
+
+    def _schedule(self, msec):
+        from tank.platform.qt import QtCore
+
+        QtCore.QTimer.singleShot(int(msec), self._run_next)
+
+    def _run_next(self):
+        if not self._tasks:
+            return
+
+        elapsed = (time.time() - self._started) * 1000.0
+        for index, (_, _, delay, name, callback) in enumerate(self._tasks):
+            if delay <= elapsed:
+                del self._tasks[index]
+                break
+        else:
+            # only deferred tasks are left, wait for the first one
+            self._schedule(min(task[2] for task in self._tasks) - elapsed)
+            return
+
+        start = time.time()
+        try:
+            callback()
+        except Exception:
+            self._logger.error(
+                "Startup task '%s' failed:\n%s", name, traceback.format_exc()
+            )
+        self._logger.debug(
+            "Startup task '%s' ran in %.3fs.", name, time.time() - start
+        )
+
+        if self._tasks:
+            self._schedule(0)
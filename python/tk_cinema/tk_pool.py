@@ -0,0 +1,126 @@
+# Copyright (c) 2013 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Pool of Toolkit API instances for Cinema
+
+"""
+
+import os
+import sys
+import threading
+
+import tank
+
+
+class TankInstancePool(object):
+    """
+    Pool of Toolkit API instances keyed by pipeline configuration root.
+
+    Each instance is reused for the paths falling under the project data roots
+    of its pipeline configuration, so that the configuration is only parsed
+    again when one of its core configuration files changes on disk.
+    """
+
+    # core configuration files whose modification invalidates an instance
+    SIGNATURE_FILES = (
+        "pipeline_configuration.yml",
+        "roots.yml",
+        "templates.yml",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances = {}
+
+    def add(self, tk):
+        """
+        Adds a Toolkit API instance to the pool.
+
+        :param tk: :class:`~sgtk.Sgtk` instance.
+        """
+        pc_root = tk.pipeline_configuration.get_path()
+        roots = [
+            _normalize(root)
+            for root in tk.pipeline_configuration.get_data_roots().values()
+            if root
+        ]
+        with self._lock:
+            self._instances[pc_root] = (tk, self._signature(pc_root), roots)
+
+    def get(self, path):
+        """
+        Returns a Toolkit API instance for the given path, reusing the one of
+        a known pipeline configuration when possible.
+
+        :param str path: Path to a file, typically a Cinema document.
+        :raises: :class:`~sgtk.TankError` if no configuration can be found.
+        """
+        normalized = _normalize(path)
+        with self._lock:
+            for pc_root, (tk, signature, roots) in list(self._instances.items()):
+                if not any(normalized.startswith(root) for root in roots):
+                    continue
+                if signature == self._signature(pc_root):
+                    return tk
+                # the configuration changed on disk
+                del self._instances[pc_root]
+                break
+
+        tk = tank.tank_from_path(path)
+        self.add(tk)
+        return tk
+
+    def find(self, pc_root):
+        """
+        Returns the instance of a pipeline configuration if it is in the pool
+        and its configuration did not change on disk, None otherwise.
+
+        :param str pc_root: Pipeline configuration root.
+        """
+        with self._lock:
+            entry = self._instances.get(pc_root)
+            if entry is None:
+                return None
+            if entry[1] != self._signature(pc_root):
+                del self._instances[pc_root]
+                return None
+            return entry[0]
+
+    def invalidate(self, pc_root=None):
+        """
+        Removes an instance from the pool, or all of them if no pipeline
+        configuration root is given.
+
+        :param str pc_root: Optional pipeline configuration root.
+        """
+        with self._lock:
+            if pc_root is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(pc_root, None)
+
+    def _signature(self, pc_root):
+        signature = []
+        for filename in self.SIGNATURE_FILES:
+            try:
+                stat = os.stat(os.path.join(pc_root, "config", "core", filename))
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime, stat.st_size))
+        return tuple(signature)
+
+
+def _normalize(path):
+    path = os.path.join(os.path.abspath(path), "")
+    if sys.platform == "win32":
+        path = path.replace("\\", "/").lower()
+    return path
@@ -1,13 +1,25 @@
 import os
 import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent import futures
 
 import sgtk
 from sgtk.platform import SoftwareLauncher, SoftwareVersion, LaunchInformation
+from sgtk.util import LocalFileStorageManager
+from sgtk.util.filesystem import ensure_folder_exists
 
 
 __author__ = "Mykhailo Datsyk"
 __contact__ = "https://www.linkedin.com/in/mykhailo-datsyk/"
 
+# Package of the Toolkit core copied to the startup bundle. It only holds
+# third party packages, which do not depend on where they are imported from.
+BUNDLED_PACKAGE = "tank_vendor"
+
 
 class CinemaLauncher(SoftwareLauncher):
     """
@@ -34,6 +46,27 @@ class CinemaLauncher(SoftwareLauncher):
         ],
     }
 
+    # Number of seconds to wait for the executable templates to be scanned.
+    # Templates on slow mounts keep being scanned in the background and their
+    # results are cached for the next scan.
+    SCAN_TIMEOUT = 5.0
+
+    # Lock protecting the scan cache, which is shared by scans running in the
+    # background.
+    _scan_cache_lock = threading.Lock()
+
+    # Launch paths already built, keyed by engine name and location,
+    # executable and Desktop environment paths.
+    _launch_paths_cache = {}
+
+    # Executable templates being scanned, possibly in the background.
+    _template_scans = set()
+    _template_scan_lock = threading.Lock()
+
+    # Startup bundles being built in the background.
+    _bundle_builds = set()
+    _bundle_lock = threading.Lock()
+
     @property
     def minimum_supported_version(self):
         """
@@ -53,15 +86,67 @@ class CinemaLauncher(SoftwareLauncher):
         :returns: :class:`LaunchInformation` instance
         """
 
-        required_env = {}
+        required_env = self._build_launch_paths(exec_path, self._startup_bundle())
 
-        # Run the engine's userSetup.py file when Cinema starts up
-        # by appending it to the env PYTHONPATH.
-        startup_path = os.path.join(self.disk_location, "startup")
+        # Prepare the launch environment with variables required by the
+        # classic bootstrap approach.
+        self.logger.debug("Preparing Cinema Launch via Toolkit Classic methodology ...")
+        required_env["SGTK_ENGINE"] = self.engine_name
+        required_env["SGTK_CONTEXT"] = sgtk.context.serialize(self.context)
 
-        sgtk.util.append_path_to_env_var("g_additionalModulePath", startup_path)
-        required_env["g_additionalModulePath"] = os.environ["g_additionalModulePath"]
+        if self.get_setting("lazy_app_loading", False):
+            # Start the engine from the first Shotgun command run in Cinema
+            required_env["SGTK_CINEMA_LAZY_APPS"] = "1"
+        elif self.get_setting("background_bootstrap", False):
+            # Start the engine once Cinema has loaded its plugins
+            required_env["SGTK_CINEMA_BACKGROUND_BOOTSTRAP"] = "1"
 
+        if file_to_open:
+            # Add the file name to open to the launch environment
+            required_env["SGTK_FILE_TO_OPEN"] = file_to_open
+
+        return LaunchInformation(exec_path, args, required_env)
+
+    ###########################################################################
+    # private methods
+
+    def _build_launch_paths(self, exec_path, bundle_path=None):
+        """
+        Returns the module and python paths of the launch environment.
+
+        The paths are deduplicated, keep their order and are computed once
+        per engine location, Cinema executable and Desktop environment. The Desktop
+        environment itself is left untouched, so it does not grow with each
+        launch.
+
+        :param str exec_path: Path to Cinema executable to launch.
+        :param str bundle_path: Optional startup bundle, put in front of the
+                                python paths.
+        :returns: Dictionary of environment variables.
+        """
+        base_module_path = os.environ.get("g_additionalModulePath", "")
+        base_python_path = os.environ.get("PYTHONPATH", "")
+        cache_key = (
+            self.engine_name,
+            self.disk_location,
+            exec_path,
+            base_module_path,
+            base_python_path,
+            bundle_path,
+        )
+
+        if cache_key in self._launch_paths_cache:
+            self.logger.debug("Reusing Cinema launch paths for %s", exec_path)
+            return dict(self._launch_paths_cache[cache_key])
+
+        start = time.time()
+
+        # Run the engine's shotgun.pyp plugin when Cinema starts up
+        # by adding its folder to the module paths.
+        startup_path = os.path.join(self.disk_location, "startup")
+        module_path = _join_paths(base_module_path.split(os.pathsep), [startup_path])
+
+        python_paths = [bundle_path] + base_python_path.split(os.pathsep)
         if "R23" in exec_path:
             # Get Qt Site - when launching from Shotgun Desktop this should
             # point to the installs lib/site-packages directory.
@@ -69,32 +154,138 @@ class CinemaLauncher(SoftwareLauncher):
                 from sgtk.platform.qt import QtCore
 
                 qt_site = os.path.dirname(os.path.dirname(QtCore.__file__))
-                sgtk.util.append_path_to_env_var("PYTHONPATH", qt_site)
+                python_paths.append(qt_site)
             except ImportError:
                 pass
+        python_path = _join_paths(
+            python_paths, [os.path.join(startup_path, "libs")]
+        )
 
-        sgtk.util.append_path_to_env_var(
-            "PYTHONPATH", os.path.join(startup_path, "libs")
+        launch_paths = {
+            "g_additionalModulePath": module_path,
+            "PYTHONPATH": python_path,
+            "C4DPYTHONPATH37": python_path,  # R23
+            "C4DPYTHONPATH39": python_path,  # R24-2023.1
+            "C4DPYTHONPATH310": python_path,  # 2023.2
+        }
+        self._launch_paths_cache[cache_key] = launch_paths
+
+        self.logger.debug(
+            "Built Cinema launch paths for %s in %.3fs",
+            exec_path,
+            time.time() - start,
         )
-        required_env["PYTHONPATH"] = os.environ["PYTHONPATH"]
-        required_env["C4DPYTHONPATH37"] = os.environ["PYTHONPATH"]  # R23
-        required_env["C4DPYTHONPATH39"] = os.environ["PYTHONPATH"]  # R24-2023.1
-        required_env["C4DPYTHONPATH310"] = os.environ["PYTHONPATH"]  # 2023.2
+        return dict(launch_paths)
 
-        # Prepare the launch environment with variables required by the
-        # classic bootstrap approach.
-        self.logger.debug("Preparing Cinema Launch via Toolkit Classic methodology ...")
-        required_env["SGTK_ENGINE"] = self.engine_name
-        required_env["SGTK_CONTEXT"] = sgtk.context.serialize(self.context)
+    def _startup_bundle(self):
+        """
+        Returns the python folder of the startup bundle, or None.
+
+        The bundle is a copy of the third party packages shipped with the
+        Toolkit core, tank_vendor, kept in the local cache so that Cinema does
+        not import them from a network share, and writes their byte code next
+        to the copy with its own interpreter. The sgtk and tank packages
+        locate their install from their own path and are left in place. The
+        bundle is used only if the size and modification time of the info.yml
+        of the core, which changes with every core update, are unchanged,
+        otherwise the source tree is used and the bundle rebuilt in the
+        background for the next launches.
+        """
+        if not self.get_setting("startup_bundle", False):
+            return None
+
+        source = os.path.join(sgtk.get_sgtk_module_path(), BUNDLED_PACKAGE)
+        core_info = _core_info_stat()
+        if core_info is None or not os.path.isdir(source):
+            return None
+
+        bundle_root = os.path.join(
+            LocalFileStorageManager.get_global_root(LocalFileStorageManager.CACHE),
+            "tk-cinema",
+            "startup_bundle",
+            hashlib.md5(source.encode("utf-8")).hexdigest()[:12],
+        )
+        bundle_path = os.path.join(bundle_root, "python")
+
+        start = time.time()
+        try:
+            with open(os.path.join(bundle_root, "manifest.json"), "r") as fh:
+                manifest = json.load(fh)
+        except (IOError, OSError, ValueError):
+            manifest = {}
+
+        if (
+            manifest.get("source") == source
+            and os.path.isdir(os.path.join(bundle_path, BUNDLED_PACKAGE))
+            and manifest.get("core_info") == core_info
+        ):
+            self.logger.debug(
+                "Using startup bundle %s, checked in %.3fs",
+                bundle_path,
+                time.time() - start,
+            )
+            return bundle_path
 
-        if file_to_open:
-            # Add the file name to open to the launch environment
-            required_env["SGTK_FILE_TO_OPEN"] = file_to_open
+        self.logger.debug(
+            "Startup bundle %s is stale, launching from %s", bundle_path, source
+        )
+        with self._bundle_lock:
+            if bundle_root in self._bundle_builds:
+                return None
+            self._bundle_builds.add(bundle_root)
+
+        thread = threading.Thread(
+            target=self._build_startup_bundle,
+            args=(source, core_info, bundle_root),
+            name="tk-cinema startup bundle",
+        )
+        thread.start()
+        return None
 
-        return LaunchInformation(exec_path, args, required_env)
+    def _build_startup_bundle(self, source, core_info, bundle_root):
+        """
+        Copies the bundled package to the startup bundle, writing its manifest
+        once it is complete.
 
-    ###########################################################################
-    # private methods
+        :param str source: Folder of the bundled package.
+        :param list core_info: Size and modification time of the info.yml of
+                               the core, recorded before the copy.
+        :param str bundle_root: Folder of the bundle.
+        """
+        start = time.time()
+        manifest_path = os.path.join(bundle_root, "manifest.json")
+        bundle_path = os.path.join(bundle_root, "python")
+        tmp_path = "%s.%s.tmp" % (bundle_path, os.getpid())
+        try:
+            # the bundle is not valid anymore while it is rebuilt
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            shutil.copytree(
+                source,
+                os.path.join(tmp_path, BUNDLED_PACKAGE),
+                ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+            )
+
+            shutil.rmtree(bundle_path, ignore_errors=True)
+            os.replace(tmp_path, bundle_path)
+
+            with open(manifest_path + ".tmp", "w") as fh:
+                json.dump(
+                    {"source": source, "core_info": core_info, "built": time.time()}, fh
+                )
+            os.replace(manifest_path + ".tmp", manifest_path)
+
+            self.logger.debug(
+                "Built startup bundle %s in %.3fs", bundle_path, time.time() - start
+            )
+        except (IOError, OSError, shutil.Error) as e:
+            self.logger.debug("Could not build the startup bundle: %s", e)
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        finally:
+            with self._bundle_lock:
+                self._bundle_builds.discard(bundle_root)
 
     def _icon_from_engine(self):
         """
@@ -131,30 +322,79 @@ class CinemaLauncher(SoftwareLauncher):
     def _find_software(self):
         """
         Find executables in the default install locations.
+
+        Templates are scanned in parallel and their matches cached on disk,
+        keyed by their install root and its modification time, so unchanged
+        install roots are not globbed again. Templates which take longer than
+        SCAN_TIMEOUT seconds are left out of the results, and not scanned again
+        until their scan completes.
         """
 
         # all the executable templates for the current OS
-        executable_templates = self.EXECUTABLE_TEMPLATES.get(sys.platform, [])
+        executable_templates = [
+            os.path.expandvars(os.path.expanduser(executable_template))
+            for executable_template in self.EXECUTABLE_TEMPLATES.get(
+                sys.platform, []
+            )
+        ]
+        if not executable_templates:
+            return []
+
+        with self._template_scan_lock:
+            scanning = [
+                executable_template
+                for executable_template in executable_templates
+                if executable_template in self._template_scans
+            ]
+            executable_templates = [
+                executable_template
+                for executable_template in executable_templates
+                if executable_template not in self._template_scans
+            ]
+            self._template_scans.update(executable_templates)
+
+        if scanning:
+            self.logger.debug(
+                "Skipping %d executable templates still being scanned.",
+                len(scanning),
+            )
+        if not executable_templates:
+            return []
 
-        # all the discovered executables
-        sw_versions = []
+        cache = self._load_scan_cache()
 
-        for executable_template in executable_templates:
-            executable_template = os.path.expanduser(executable_template)
-            executable_template = os.path.expandvars(executable_template)
+        executor = futures.ThreadPoolExecutor(
+            max_workers=len(executable_templates)
+        )
+        jobs = [
+            executor.submit(self._scan_template_once, executable_template, cache)
+            for executable_template in executable_templates
+        ]
+        (done, not_done) = futures.wait(jobs, timeout=self.SCAN_TIMEOUT)
+        # slow templates complete in the background
+        executor.shutdown(wait=False)
+
+        if not_done:
+            self.logger.debug(
+                "%d executable templates are still being scanned, they will "
+                "be available from the next scan.",
+                len(not_done),
+            )
 
-            self.logger.debug("Processing template %s", executable_template)
+        # all the discovered executables
+        sw_versions = []
 
-            executable_matches = self._glob_and_match(
-                executable_template, self.COMPONENT_REGEX_LOOKUP
-            )
+        for job in jobs:
+            if job not in done or job.exception():
+                continue
 
             # Extract all products from that executable.
-            for executable_path, key_dict in executable_matches:
+            for executable_path, key_dict in job.result():
                 # extract the matched keys form the key_dict.
                 # in the case of version we return something different than
-                # an empty string because there are cases were the installation
-                # directories do not include version number information.
+                # an empty string because there are cases were the
+                # installation directories do not include version number
+                # information.
                 executable_version = key_dict.get("version", " ").lstrip("R")
 
                 sw_versions.append(
@@ -167,3 +407,131 @@ class CinemaLauncher(SoftwareLauncher):
                 )
 
         return sw_versions
+
+    def _scan_template_once(self, executable_template, cache):
+        """
+        Scans an executable template, then allows it to be scanned again.
+        """
+        try:
+            return self._scan_template(executable_template, cache)
+        finally:
+            with self._template_scan_lock:
+                self._template_scans.discard(executable_template)
+
+    def _scan_template(self, executable_template, cache):
+        """
+        Globs an executable template, reusing the cached matches if its
+        install root did not change.
+
+        :param str executable_template: Expanded executable template.
+        :param dict cache: Scan cache, updated with the template matches.
+        :returns: A list of (executable path, key dict) tuples.
+        """
+        install_root = _install_root(executable_template)
+        try:
+            mtime = os.stat(install_root).st_mtime
+        except OSError:
+            mtime = None
+
+        cached = cache.get(executable_template)
+        if (
+            cached
+            and cached["root"] == install_root
+            and cached["mtime"] == mtime
+        ):
+            self.logger.debug("Using cached scan of %s", executable_template)
+            return cached["matches"]
+
+        self.logger.debug("Processing template %s", executable_template)
+
+        matches = []
+        if mtime is not None:
+            matches = [
+                (executable_path, key_dict)
+                for executable_path, key_dict in self._glob_and_match(
+                    executable_template, self.COMPONENT_REGEX_LOOKUP
+                )
+            ]
+
+        with self._scan_cache_lock:
+            cache[executable_template] = {
+                "root": install_root,
+                "mtime": mtime,
+                "matches": matches,
+            }
+            self._save_scan_cache(cache)
+
+        return matches
+
+    @property
+    def _scan_cache_path(self):
+        return os.path.join(
+            LocalFileStorageManager.get_global_root(LocalFileStorageManager.CACHE),
+            "tk-cinema",
+            "software_scan.json",
+        )
+
+    def _load_scan_cache(self):
+        """
+        Reads the scan cache persisted by the previous scans.
+        """
+        try:
+            with open(self._scan_cache_path, "r") as fh:
+                return json.load(fh)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save_scan_cache(self, cache):
+        """
+        Persists the scan cache for the next Desktop sessions.
+        """
+        try:
+            ensure_folder_exists(os.path.dirname(self._scan_cache_path))
+            tmp_path = "%s.%s.tmp" % (self._scan_cache_path, os.getpid())
+            with open(tmp_path, "w") as fh:
+                json.dump(cache, fh)
+            os.replace(tmp_path, self._scan_cache_path)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not save the software scan cache: %s", e)
+
+
+def _install_root(executable_template):
+    """
+    Returns the deepest folder of an executable template which does not
+    depend on any of its keys.
+    """
+    root = executable_template.split("{", 1)[0]
+    if root == executable_template:
+        return os.path.dirname(executable_template)
+    return os.path.dirname(root)
+
+
+def _join_paths(*path_lists):
+    """
+    Joins lists of paths into a single path variable, dropping empty and
+    duplicated entries while keeping the first occurrence of each path.
+    """
+    seen = set()
+    paths = []
+    for path_list in path_lists:
+        for path in path_list:
+            if not path:
+                continue
+            key = os.path.normcase(os.path.normpath(path))
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return os.pathsep.join(paths)
+
+
+def _core_info_stat():
+    """
+    Returns the size and modification time of the info.yml of the running
+    Toolkit core, or None if the core has none.
+    """
+    path = os.path.join(os.path.dirname(sgtk.get_sgtk_module_path()), "info.yml")
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime]